@@ -0,0 +1,29 @@
+import numpy as np
+from numba import njit, prange #type: ignore
+
+@njit(parallel=True, fastmath=True, cache=True)
+def bm25_kernel(indptr, indices, saturated, query_weights):
+    """
+    Scores every chunk of a CSR BM25 matrix against the query's idf weights, one chunk per parallel iteration.
+
+    Only imported by `app.reranker` the first time a corpus of at least `NUMBA_MIN_CHUNKS` chunks is scored,
+    so numba and llvmlite are never loaded for the usual handful of retrieved chunks.
+
+    Args:
+        indptr (np.ndarray): CSR row pointers, one row per chunk.
+        indices (np.ndarray): CSR term ids.
+        saturated (np.ndarray): CSR length-normalized, saturated term frequencies.
+        query_weights (np.ndarray): The query's idf weight for every term id.
+
+    Returns:
+        np.ndarray: One BM25 score per chunk.
+    """
+
+    num_docs = len(indptr) - 1
+    scores = np.zeros(num_docs)
+    for doc in prange(num_docs):
+        score = 0.0
+        for entry in range(indptr[doc], indptr[doc + 1]):
+            score += query_weights[indices[entry]] * saturated[entry]
+        scores[doc] = score
+    return scores
\ No newline at end of file
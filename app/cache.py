@@ -1,7 +1,152 @@
 import time
+import math
+import hashlib
+import logging
+import threading
+from cachetools import TTLCache
 from app.config import CONFIG
 
-cache = {}
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = CONFIG["cache"]["ttl_seconds"]
+
+_VALID_QUERY_TYPES = frozenset({'document', 'agent', 'sql', 'web'})
+
+cache = TTLCache(maxsize=CONFIG["cache"]["max_items"], ttl=CACHE_TTL, timer=time.monotonic)
+_cache_lock = threading.Lock()
+
+def _create_redis_client():
+    """
+    Creates a Redis client when the cache backend is configured as 'redis'.
+
+    The client is shared by every worker process pointing at the same Redis server, so a response
+    cached by one Uvicorn/Gunicorn worker is visible to all of them. Expiry is delegated to Redis
+    via `SET EX`, and eviction under memory pressure to the configured `maxmemory-policy`.
+
+    Returns:
+        redis.Redis or None: A connected client, or None if the in-process backend is configured or Redis is unreachable.
+    """
+
+    cache_config = CONFIG["cache"]
+    if cache_config.get("backend", "memory") != "redis":
+        return None
+
+    try:
+        import redis #type: ignore
+        client = redis.Redis.from_url(cache_config["redis_url"], decode_responses=True)
+        client.ping()
+        policy = cache_config.get("redis_maxmemory_policy")
+        if policy:
+            try:
+                client.config_set("maxmemory-policy", policy)
+            except Exception as e:
+                logger.warning(f"Could not set Redis maxmemory-policy to {policy}: {str(e)}")
+        logger.info(f"Using Redis cache backend at {cache_config['redis_url']}")
+        return client
+    except Exception as e:
+        logger.error(f"Failed to connect to Redis, falling back to in-process cache: {str(e)}")
+        return None
+
+redis_client = _create_redis_client()
+
+class _BloomFilter:
+    """
+    Process-local Bloom filter used to skip cache lookups for keys that were never written.
+
+    The k bit positions are derived from a single BLAKE2b digest with double hashing
+    (h_i = h1 + i * h2), so each membership test costs one hash instead of k.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class _RotatingBloomFilter:
+    """
+    Two-generation Bloom filter whose bits age out along with the Redis keys they describe.
+
+    Keys are added to the current generation and looked up in both. Every `CACHE_TTL` seconds the current
+    generation becomes the previous one and the old previous one is dropped, so a key stays visible for at least
+    one TTL after it was written (by which time Redis has expired it) and the filter never saturates in a
+    long-running worker. A generation that fills to `capacity` before its TTL is up is rotated early; that can
+    only turn a few live keys into cache misses, never serve a wrong response.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, period: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.period = period
+        self._lock = threading.Lock()
+        self._current = _BloomFilter(capacity, error_rate)
+        self._previous = None
+        self._rotated_at = time.monotonic()
+
+    def _maybe_rotate(self):
+        now = time.monotonic()
+        if now - self._rotated_at < self.period and self._current.count < self.capacity:
+            return
+        with self._lock:
+            if now - self._rotated_at >= self.period or self._current.count >= self.capacity:
+                self._previous = None if now - self._rotated_at >= 2 * self.period else self._current
+                self._current = _BloomFilter(self.capacity, self.error_rate)
+                self._rotated_at = now
+
+    def add(self, key: str):
+        self._maybe_rotate()
+        self._current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        self._maybe_rotate()
+        previous = self._previous
+        return key in self._current or (previous is not None and key in previous)
+
+def _create_bloom_filter():
+    """
+    Creates the admission Bloom filter for the Redis backend and seeds it with the keys already stored in Redis.
+
+    The filter is per process: a key written by another worker after startup is treated as a miss
+    by this worker until it writes the key itself, which is why it is opt-in via `cache.bloom_filter`.
+
+    Only the cache's own key prefixes are scanned, so other data in a shared Redis is left alone.
+
+    Returns:
+        _RotatingBloomFilter or None: The seeded filter, or None if disabled or not using Redis.
+    """
+
+    cache_config = CONFIG["cache"]
+    if redis_client is None or not cache_config.get("bloom_filter", False):
+        return None
+
+    bloom = _RotatingBloomFilter(cache_config.get("bloom_capacity", 100000), cache_config.get("bloom_error_rate", 0.001), CACHE_TTL)
+    try:
+        count = 0
+        for query_type in _VALID_QUERY_TYPES:
+            for key in redis_client.scan_iter(match=f"{query_type}:*", count=1000):
+                bloom.add(key)
+                count += 1
+        logger.info(f"Seeded cache Bloom filter with {count} keys from Redis")
+    except Exception as e:
+        logger.error(f"Failed to seed cache Bloom filter from Redis, disabling it: {str(e)}")
+        return None
+    return bloom
+
+_bloom = _create_bloom_filter()
 
 def get_cached_response(query: str, query_type: str, context: dict = None) -> str:
     """
@@ -16,19 +161,33 @@ def get_cached_response(query: str, query_type: str, context: dict = None) -> st
         str or None: The cached response if valid and not expired; otherwise, None.
     """
     cache_key = _create_cache_key(query, query_type, context)
-        
-    entry = cache.get(cache_key)
-    if entry:
-        response, timestamp = entry
-        if time.time() - timestamp < CONFIG["cache"]["ttl_seconds"]:
-            return response
-        else:
-            del cache[cache_key] 
-    return None
+
+    if redis_client is not None:
+        if _bloom is not None and cache_key not in _bloom:
+            return None
+        try:
+            return redis_client.get(cache_key)
+        except Exception as e:
+            logger.error(f"Redis cache lookup failed: {str(e)}")
+            return None
+
+    with _cache_lock:
+        return cache.get(cache_key)
 
 def set_cached_response(query: str, response: str, query_type: str, context: dict = None):
     cache_key = _create_cache_key(query, query_type, context)
-    cache[cache_key] = (response, time.time())
+
+    if redis_client is not None:
+        try:
+            redis_client.set(cache_key, response, ex=CACHE_TTL)
+            if _bloom is not None:
+                _bloom.add(cache_key)
+        except Exception as e:
+            logger.error(f"Redis cache write failed: {str(e)}")
+        return
+
+    with _cache_lock:
+        cache[cache_key] = response
 
 def _create_cache_key(query: str, query_type: str, context: dict = None) -> str:
     """
@@ -36,26 +195,30 @@ def _create_cache_key(query: str, query_type: str, context: dict = None) -> str:
 
     Args:
         query (str): The input query string.
-        query_type (str): The category of the query ('document', 'sql', or 'web').
+        query_type (str): The category of the query ('document', 'agent', 'sql', or 'web'). 'agent' holds the
+                        agent workflow's final answer, which may come from the web, apart from document-only answers.
         context (dict, optional): Additional context used to construct the cache key,
                                 such as SDS paths for documents or schema name for SQL.
 
     Returns:
-        str: A uniquely formatted string to be used as a cache key.
-        
+        str: A fixed-length cache key of the form '<query_type>:<hex digest>', where the digest is a
+            BLAKE2b hash of the query and its context so long queries or path lists don't inflate key size.
+
     Raises:
         ValueError: If an unsupported query_type is provided.
     """
 
-    if query_type not in ['document', 'sql', 'web']:
+    if query_type == 'web':
+        return f"web:{hashlib.blake2b(f'web:{query}'.encode('utf-8'), digest_size=16).hexdigest()}"
+
+    if query_type not in _VALID_QUERY_TYPES:
         raise ValueError(f"Invalid query_type: {query_type}")
 
-    if query_type == 'document' and context and 'sds_paths' in context:
+    if query_type in ('document', 'agent') and context and 'sds_paths' in context:
         paths = ':'.join(sorted(context['sds_paths']))
-        return f"{query_type}:{query}:{paths}"
+        key_source = f"{query_type}:{query}:{paths}"
     elif query_type == 'sql' and context and 'schema_name' in context:
-        return f"{query_type}:{query}:{context['schema_name']}"
-    elif query_type == 'web':
-        return f"{query_type}:{query}"
+        key_source = f"{query_type}:{query}:{context['schema_name']}"
     else:
-        return f"{query_type}:{query}"
\ No newline at end of file
+        key_source = f"{query_type}:{query}"
+    return f"{query_type}:{hashlib.blake2b(key_source.encode('utf-8'), digest_size=16).hexdigest()}"
\ No newline at end of file
@@ -1,9 +1,19 @@
 import yaml
+from types import MappingProxyType
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 def load_config(config_path="config.yaml"):
     try:
         with open(config_path, "r") as f:
-            return yaml.safe_load(f)
+            return _freeze(yaml.load(f, Loader=_Loader))
     except FileNotFoundError:
         raise Exception(f"Config file not found at {config_path}")
     except yaml.YAMLError as e:
@@ -0,0 +1,213 @@
+import os
+import atexit
+import logging
+import functools
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from app.config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+def _hub_model_id(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+def _export_quantized_model(model_name: str, model_dir: str) -> None:
+    """
+    Exports a sentence-transformers model to ONNX and dynamically quantizes its weights to INT8.
+
+    The quantization config targets AVX-512 VNNI so MatMuls run as int8 dot-products on CPUs that support them;
+    ONNX Runtime falls back to plain int8 kernels elsewhere. Only needed once per `model_dir`.
+
+    Args:
+        model_name (str): The sentence-transformers model name or Hugging Face Hub id.
+        model_dir (str): Directory the quantized model and its tokenizer are written to.
+    """
+
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer #type: ignore
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig #type: ignore
+    from transformers import AutoTokenizer
+
+    logger.info(f"Exporting {model_name} to INT8 ONNX in {model_dir}")
+    model = ORTModelForFeatureExtraction.from_pretrained(_hub_model_id(model_name), export=True)
+    AutoTokenizer.from_pretrained(_hub_model_id(model_name)).save_pretrained(model_dir)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+
+@functools.lru_cache(maxsize=1)
+def _get_session(model_name: str, model_dir: str):
+    """
+    Returns the process-wide ONNX Runtime session for the quantized model, exporting it on first use.
+
+    Args:
+        model_name (str): The sentence-transformers model name or Hugging Face Hub id.
+        model_dir (str): Directory holding (or receiving) the quantized model.
+
+    Returns:
+        onnxruntime.InferenceSession: The shared session, with all graph optimizations enabled.
+    """
+
+    import onnxruntime as ort #type: ignore
+
+    model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE)
+    if not os.path.exists(model_path):
+        _export_quantized_model(model_name, model_dir)
+
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = os.cpu_count() or 1
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession(model_path, sess_options, providers=["CPUExecutionProvider"])
+    logger.info(f"Loaded INT8 ONNX embedding model from {model_path}")
+    return session
+
+@functools.lru_cache(maxsize=1)
+def _get_tokenizer(model_dir: str):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_dir)
+
+@atexit.register
+def _release_session():
+    _get_session.cache_clear()
+    _get_tokenizer.cache_clear()
+
+class OnnxEmbeddings(Embeddings):
+    """
+    LangChain embeddings backed by an INT8-quantized ONNX export of a sentence-transformers model.
+
+    Produces the same mean-pooled, L2-normalized vectors as the PyTorch model, so it can replace
+    `HuggingFaceEmbeddings` in FAISS indexes without changing how they are searched. The session and
+    tokenizer are process-wide singletons, so instances are cheap and share one copy of the weights.
+    """
+
+    def __init__(self, model_name: str, model_dir: str, batch_size: int = 64, max_length: int = 256):
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    @property
+    def session(self):
+        return _get_session(self.model_name, self.model_dir)
+
+    @property
+    def tokenizer(self):
+        return _get_tokenizer(self.model_dir)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts in length-sorted batches of `batch_size`, each padded only to its own longest sequence,
+        so short chunks don't pay for the padding of long ones. Results are returned in input order.
+        `token_type_ids` are only produced when the exported graph takes them as an input.
+        """
+
+        tokenizer = self.tokenizer
+        needs_token_type_ids = any(model_input.name == "token_type_ids" for model_input in self.session.get_inputs())
+        encoded = tokenizer(texts, truncation=True, max_length=self.max_length, return_token_type_ids=needs_token_type_ids)
+        order = np.argsort([len(input_ids) for input_ids in encoded["input_ids"]], kind="stable")
+        embeddings = None
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            batch = tokenizer.pad(
+                {name: [encoded[name][i] for i in indices] for name in encoded.keys()},
+                padding="longest",
+                return_tensors="np"
+            )
+            batch_embeddings = self._embed_batch(batch)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+            embeddings[indices] = batch_embeddings
+        return embeddings
+
+    def _embed_batch(self, encoded) -> np.ndarray:
+        session = self.session
+        inputs = {model_input.name: encoded[model_input.name].astype(np.int64) for model_input in session.get_inputs() if model_input.name in encoded}
+        token_embeddings = session.run(None, inputs)[0]
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
+
+@functools.lru_cache(maxsize=1)
+def get_embedding_model() -> Embeddings:
+    """
+    Returns the process-wide embedding model selected by `embedding.backend`, loading it on first use.
+
+    With the 'onnx' backend the INT8 ONNX model is used (exported on first run); if onnxruntime/optimum
+    are unavailable or the export fails, the PyTorch model is loaded instead, on `embedding.device` if set
+    (otherwise sentence-transformers picks CUDA when available). Both return unit-length
+    vectors, so a query embedding can be searched against inner-product and L2 indexes alike.
+
+    Returns:
+        Embeddings: The ONNX-backed embeddings, or `HuggingFaceEmbeddings` as a fallback.
+    """
+
+    embedding_config = CONFIG["embedding"]
+    if embedding_config.get("backend", "huggingface") == "onnx":
+        try:
+            _get_session(embedding_config["model_name"], embedding_config["onnx_model_dir"])
+            _get_tokenizer(embedding_config["onnx_model_dir"])
+            return OnnxEmbeddings(
+                embedding_config["model_name"],
+                embedding_config["onnx_model_dir"],
+                batch_size=embedding_config.get("batch_size", 64)
+            )
+        except Exception as e:
+            logger.error(f"Failed to load ONNX embedding model, falling back to HuggingFace: {str(e)}")
+    model_kwargs = {"device": embedding_config["device"]} if embedding_config.get("device") else {}
+    embeddings = HuggingFaceEmbeddings(
+        model_name=embedding_config["model_name"],
+        model_kwargs=model_kwargs,
+        encode_kwargs={"normalize_embeddings": True, "batch_size": embedding_config.get("batch_size", 64)}
+    )
+    if embedding_config.get("quantize_fallback", True):
+        _quantize_dynamic(embeddings)
+    return embeddings
+
+def _quantize_dynamic(embeddings: HuggingFaceEmbeddings) -> None:
+    """
+    Converts the Linear layers of a CPU-resident sentence-transformers model to dynamically quantized INT8 in place,
+    so the PyTorch fallback gets most of the speedup of the ONNX model. GPU models are left at full precision.
+
+    Args:
+        embeddings (HuggingFaceEmbeddings): The LangChain wrapper whose `client` is the SentenceTransformer.
+    """
+
+    try:
+        import torch
+        model = embeddings.client
+        if model.device.type != "cpu":
+            return
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        logger.info("Dynamically quantized the fallback embedding model to INT8")
+    except Exception as e:
+        logger.warning(f"Could not quantize the fallback embedding model, keeping FP32: {str(e)}")
+
+def describe_embedding_model(embeddings: Embeddings) -> str:
+    """
+    Identifies the embedder that actually loaded, so vectors from the INT8 ONNX model, the quantized PyTorch
+    fallback and the FP32 PyTorch fallback are never mistaken for one another.
+
+    Args:
+        embeddings (Embeddings): The model returned by `get_embedding_model`.
+
+    Returns:
+        str: The embedder's class, model name and, for the PyTorch fallback, whether it was quantized to INT8.
+    """
+
+    description = f"{type(embeddings).__name__}:{getattr(embeddings, 'model_name', '')}"
+    if isinstance(embeddings, HuggingFaceEmbeddings):
+        quantized = any("quantized" in type(module).__module__ for module in embeddings.client.modules())
+        description += ":int8" if quantized else ":fp32"
+    return description
\ No newline at end of file
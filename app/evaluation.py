@@ -1,18 +1,183 @@
 import logging
 from typing import List, Dict, Any
 from opik import Opik #type: ignore
-import json
+import orjson
 import os
+import atexit
 from app.config import CONFIG
-from app.rag import RAGSystem
-from datetime import datetime
+from app.rag import get_rag_system
 import opik #type: ignore
 import importlib 
-import inspect
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import torch
 from sentence_transformers import SentenceTransformer, util
 
 logger = logging.getLogger(__name__)
 
+_METRIC_POOL = ThreadPoolExecutor(
+    max_workers=CONFIG["evaluation"].get("max_metric_workers") or min(4, os.cpu_count() or 1),
+    thread_name_prefix="evaluation-metric"
+)
+
+_writer_lock = threading.Lock()
+_writer = None
+_writer_path = None
+
+def _write_evaluation_record(output_dir: str, day: str, record: dict) -> str:
+    """
+    Appends one evaluation record as a compact JSON line to the day's evaluation log.
+
+    The log file is kept open in append mode and only reopened when the day changes, so each evaluation
+    costs one write and flush instead of a file open, encode and close; flushing keeps the log tailable
+    and loses nothing if the process dies.
+
+    Args:
+        output_dir (str): Directory holding the evaluation logs.
+        day (str): Day stamp (YYYYMMDD) selecting the log file.
+        record (dict): The evaluation data to write.
+
+    Returns:
+        str: Path of the log file the record was appended to.
+    """
+
+    global _writer, _writer_path
+    path = os.path.join(output_dir, f"evaluation_{day}.jsonl")
+    line = orjson.dumps(record) + b"\n"
+    with _writer_lock:
+        if _writer_path != path:
+            if _writer:
+                _writer.close()
+            _writer = open(path, "ab")
+            _writer_path = path
+        _writer.write(line)
+        _writer.flush()
+    return path
+
+@atexit.register
+def _close_evaluation_writer():
+    with _writer_lock:
+        if _writer:
+            _writer.close()
+
+_similarity_model_lock = threading.Lock()
+_similarity_model = None
+
+def get_similarity_model() -> SentenceTransformer:
+    """
+    Returns the process-wide SentenceTransformer used for context-precision scoring, loading it on first use.
+
+    On a CUDA device the weights are cast to half precision (bfloat16 where supported), halving
+    memory traffic per forward pass; on CPU the model stays in FP32. The model is shared by every
+    EvaluationSystem in the process, so the weights are read from disk only once.
+
+    Returns:
+        SentenceTransformer: The loaded similarity model in eval mode.
+    """
+
+    global _similarity_model
+    with _similarity_model_lock:
+        if _similarity_model is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model = SentenceTransformer(CONFIG["embedding"]["model_name"], device=device)
+            if device == "cuda":
+                dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                model = model.to(dtype)
+            _similarity_model = model.eval()
+        return _similarity_model
+
+class HallucinationBatcher:
+    """
+    Coalesces concurrent hallucination scoring requests into batches that are sent to the LLM together.
+
+    Callers block on `score`, while a background thread takes the next request together with whatever else is
+    already queued (up to `max_batch_size`) and issues the whole batch concurrently through the metric's async
+    `ascore`, so N concurrent evaluations cost roughly one LLM round-trip instead of N sequential ones. It never
+    waits for more requests to arrive, so a lone evaluation is scored straight away.
+    """
+
+    def __init__(self, metric, max_batch_size: int = 16):
+        self.metric = metric
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="hallucination-batcher", daemon=True)
+        self._worker.start()
+
+    def score(self, query: str, answer: str, context: List[str]):
+        """
+        Scores a single (query, answer, context) triple, waiting for its batch to complete.
+
+        Args:
+            query (str): The original user query.
+            answer (str): The generated response to be evaluated.
+            context (List[str]): Reference chunks the answer should be grounded in.
+
+        Returns:
+            ScoreResult: The metric's score result for this triple.
+
+        Raises:
+            Exception: Any error raised by the metric for this triple.
+        """
+
+        future = Future()
+        self._queue.put(((query, answer, context), future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process_batch(batch)
+
+    def _process_batch(self, batch):
+        logger.info(f"Scoring hallucination batch of {len(batch)} requests")
+        try:
+            results = asyncio.run(self._ascore_all([args for args, _ in batch]))
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _ascore_all(self, items):
+        if hasattr(self.metric, 'ascore'):
+            tasks = [self.metric.ascore(*item) for item in items]
+        else:
+            tasks = [asyncio.to_thread(self.metric.score, *item) for item in items]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+_hallucination_batcher_lock = threading.Lock()
+_hallucination_batcher = None
+
+def get_hallucination_batcher(metric) -> HallucinationBatcher:
+    """
+    Returns the process-wide HallucinationBatcher, starting its worker thread on first use.
+
+    Sharing one batcher (and one queue) is what lets concurrent evaluations be coalesced into a batch;
+    the metric passed by later callers is ignored once the batcher exists.
+
+    Args:
+        metric: The hallucination metric to score with when the batcher is created.
+
+    Returns:
+        HallucinationBatcher: The shared batcher.
+    """
+
+    global _hallucination_batcher
+    with _hallucination_batcher_lock:
+        if _hallucination_batcher is None:
+            _hallucination_batcher = HallucinationBatcher(metric, max_batch_size=CONFIG["evaluation"]["batch_size"])
+        return _hallucination_batcher
+
 class EvaluationSystem:
     def __init__(self):
         try:
@@ -38,13 +203,14 @@ class EvaluationSystem:
                 logger.warning("Metrics may fail unless Groq configuration is resolved.")
             
             try:
-                self.similarity_model = SentenceTransformer(CONFIG["embedding"]["model_name"])
-                logger.info(f"Initialized SentenceTransformer: {CONFIG['embedding']['model_name']}")
+                self.similarity_model = get_similarity_model()
+                logger.info(f"Initialized SentenceTransformer: {CONFIG['embedding']['model_name']} on {self.similarity_model.device}")
             except Exception as e:
                 logger.error(f"Failed to initialize SentenceTransformer: {str(e)}")
                 self.similarity_model = None
             
             self.available_metrics = {}
+            self.metric_instances = {}
             metric_names = ['Hallucination', 'ContextPrecision']
             for metric_name in metric_names:
                 try:
@@ -53,10 +219,11 @@ class EvaluationSystem:
                     if metric_class:
                         self.available_metrics[metric_name.lower()] = metric_class
                         logger.info(f"Metric {metric_name} is available")
-                        metric_instance = metric_class()
+                        metric_instance = metric_class(model=f"groq/{self.model_name}")
                         if hasattr(metric_instance, 'score'):
-                            score_sig = inspect.signature(metric_instance.score)
-                            logger.info(f"{metric_name}.score signature: {score_sig}")
+                            self.metric_instances[metric_name.lower()] = metric_instance
+                        else:
+                            logger.warning(f"Metric {metric_name} has no 'score' method. It will be skipped.")
                     else:
                         logger.warning(f"Metric {metric_name} not found in opik.evaluation.metrics")
                 except Exception as e:
@@ -64,11 +231,17 @@ class EvaluationSystem:
                     
             if not self.available_metrics:
                 logger.error("No evaluation metrics available. Evaluation will return default scores.")
+
+            self.hallucination_batcher = None
+            if "hallucination" in self.metric_instances:
+                self.hallucination_batcher = get_hallucination_batcher(self.metric_instances["hallucination"])
         except Exception as e:
             logger.error(f"Failed to initialize Opik client: {str(e)}")
             self.opik_client = None
             self.available_metrics = {}
+            self.metric_instances = {}
             self.similarity_model = None
+            self.hallucination_batcher = None
 
     def get_top_chunks(self, query: str, sds_paths: List[str]) -> List[str]:
         """
@@ -83,10 +256,10 @@ class EvaluationSystem:
         """
 
         try:
-            rag_system = RAGSystem(sds_paths=sds_paths)
+            rag_system = get_rag_system(sds_paths)
             retriever = rag_system.vectorstore.as_retriever(search_kwargs={"k": CONFIG["retriever"]["search_k"]})
             docs = retriever.invoke(query)
-            expected_sources = [os.path.basename(path) for path in sds_paths]
+            expected_sources = {os.path.basename(path) for path in sds_paths}
             filtered_docs = [doc for doc in docs if doc.metadata.get("source") in expected_sources]
             
             chunk_texts = [doc.page_content for doc in filtered_docs]
@@ -118,7 +291,7 @@ class EvaluationSystem:
             "context_precision": 0.0
         }
         
-        if not self.opik_client or not self.available_metrics:
+        if not self.opik_client or not self.metric_instances:
             logger.warning("Opik client or metrics not initialized. Returning default scores.")
             return metrics
 
@@ -129,47 +302,27 @@ class EvaluationSystem:
                 return metrics
 
         try:
-            for metric_name, metric_class in self.available_metrics.items():
+            futures = {
+                _METRIC_POOL.submit(self._score_metric, metric_name, metric_instance, query, answer, ground_truth): metric_name
+                for metric_name, metric_instance in self.metric_instances.items()
+                if metric_name != "hallucination"
+            }
+            if "hallucination" in self.metric_instances:
+                hallucination_future = Future()
                 try:
-                    metric_instance = metric_class(model=f"groq/{self.model_name}")
-                    if hasattr(metric_instance, 'score'):
-                        if metric_name == "hallucination":
-                            logger.info(f"Evaluating hallucination for query: {query[:50]}...")
-                            score_result = metric_instance.score(query, answer, ground_truth)
-                            score = score_result.score if score_result and hasattr(score_result, 'score') else 0.0
-                            metrics["hallucination"] = float(score)
-                            logger.info(f"Hallucination Score: {metrics['hallucination']:.4f}")
-                        elif metric_name == "contextprecision":
-                            logger.info(f"Evaluating context precision for query: {query[:50]}...")
-                            is_based_on_chunk = False
-                            if self.similarity_model:
-                                answer_embedding = self.similarity_model.encode(answer, convert_to_tensor=True)
-                                for chunk in ground_truth:
-                                    chunk_embedding = self.similarity_model.encode(chunk, convert_to_tensor=True)
-                                    similarity = util.cos_sim(answer_embedding, chunk_embedding).item()
-                                    logger.info(f"Similarity score with chunk '{chunk[:50]}...': {similarity:.4f}")
-                                    if similarity > 0.5:
-                                        is_based_on_chunk = True
-                                        break
-                                if not is_based_on_chunk:
-                                    answer_words = set(answer.lower().split())
-                                    for chunk in ground_truth:
-                                        chunk_words = set(chunk.lower().split())
-                                        overlap = len(answer_words & chunk_words) / len(answer_words)
-                                        logger.info(f"Keyword overlap with chunk '{chunk[:50]}...': {overlap:.4f}")
-                                        if overlap > 0.5:
-                                            is_based_on_chunk = True
-                                            break
-                            score = 1.0 if is_based_on_chunk else 0.0
-                            metrics["context_precision"] = float(score)
-                            logger.info(f"Context Precision custom score: {score:.4f}")
-                        else:
-                            logger.warning(f"Unknown metric {metric_name}. Skipping.")
-                    else:
-                        logger.warning(f"Metric {metric_name} has no 'score' method. Skipping.")
+                    hallucination_future.set_result(self._score_metric("hallucination", self.metric_instances["hallucination"], query, answer, ground_truth))
+                except Exception as e:
+                    hallucination_future.set_exception(e)
+                futures[hallucination_future] = "hallucination"
+            for future in as_completed(futures):
+                metric_name = futures[future]
+                try:
+                    result = future.result()
+                    if result is not None:
+                        metric_key, score = result
+                        metrics[metric_key] = score
                 except Exception as e:
                     logger.error(f"Error evaluating {metric_name}: {str(e)}", exc_info=True)
-                    metrics["context_precision"] = 0.0
 
             self._save_evaluation_results(query, answer, ground_truth, metrics, is_web_search)
             logger.info(f"Final evaluation metrics: {metrics}")
@@ -179,9 +332,72 @@ class EvaluationSystem:
             logger.error(f"Error during evaluation: {str(e)}", exc_info=True)
             return metrics
 
+    def _score_metric(self, metric_name: str, metric_instance, query: str, answer: str, ground_truth: List[str]):
+        """
+        Computes a single evaluation metric. Context precision runs on the shared metric thread pool while
+        the network-bound hallucination judge is scored on the calling thread, so the two overlap and pool
+        workers are never held blocked waiting on a hallucination batch.
+
+        Args:
+            metric_name (str): Lowercased metric name ('hallucination' or 'contextprecision').
+            metric_instance: The Opik metric instance created at construction time.
+            query (str): The original user query.
+            answer (str): The generated response to be evaluated.
+            ground_truth (List[str]): Reference chunks to evaluate against.
+
+        Returns:
+            Tuple[str, float] or None: The metrics key and its score, or None if the metric was skipped.
+        """
+
+        if metric_name == "hallucination":
+            logger.debug("Evaluating hallucination for query: %.50s...", query)
+            if self.hallucination_batcher:
+                score_result = self.hallucination_batcher.score(query, answer, ground_truth)
+            else:
+                score_result = metric_instance.score(query, answer, ground_truth)
+            score = score_result.score if score_result and hasattr(score_result, 'score') else 0.0
+            logger.info(f"Hallucination Score: {float(score):.4f}")
+            return "hallucination", float(score)
+        elif metric_name == "contextprecision":
+            logger.debug("Evaluating context precision for query: %.50s...", query)
+            is_based_on_chunk = False
+            if self.similarity_model:
+                batch_size = CONFIG["evaluation"]["similarity_batch_size"]
+                answer_embedding = None
+                for start in range(0, len(ground_truth), batch_size):
+                    batch = ground_truth[start:start + batch_size]
+                    with torch.inference_mode():
+                        if answer_embedding is None:
+                            embeddings = self.similarity_model.encode([answer] + batch, convert_to_tensor=True, batch_size=batch_size + 1).float()
+                            answer_embedding, chunk_embeddings = embeddings[0], embeddings[1:]
+                        else:
+                            chunk_embeddings = self.similarity_model.encode(batch, convert_to_tensor=True, batch_size=batch_size).float()
+                    similarities = util.cos_sim(answer_embedding, chunk_embeddings)[0]
+                    if logger.isEnabledFor(logging.DEBUG):
+                        for chunk, similarity in zip(batch, similarities.tolist()):
+                            logger.debug("Similarity score with chunk '%.50s...': %.4f", chunk, similarity)
+                    if torch.any(similarities > 0.5).item():
+                        is_based_on_chunk = True
+                        break
+                answer_words = set(answer.lower().split())
+                if not is_based_on_chunk and answer_words:
+                    chunk_word_sets = [frozenset(chunk.lower().split()) for chunk in ground_truth]
+                    for chunk, chunk_words in zip(ground_truth, chunk_word_sets):
+                        overlap = sum(word in chunk_words for word in answer_words) / len(answer_words)
+                        logger.debug("Keyword overlap with chunk '%.50s...': %.4f", chunk, overlap)
+                        if overlap > 0.5:
+                            is_based_on_chunk = True
+                            break
+            score = 1.0 if is_based_on_chunk else 0.0
+            logger.info(f"Context Precision custom score: {score:.4f}")
+            return "context_precision", float(score)
+
+        logger.warning(f"Unknown metric {metric_name}. Skipping.")
+        return None
+
     def _save_evaluation_results(self, query: str, answer: str, ground_truth: List[str], metrics: Dict[str, float], is_web_search: bool = False):
         """
-        Saves evaluation results, including query, answer, metrics, and ground truth, to a JSON file.
+        Saves evaluation results, including query, answer, metrics, and ground truth, as one line in the daily JSONL evaluation log.
 
         Args:
             query (str): The original user query.
@@ -192,9 +408,8 @@ class EvaluationSystem:
         """
 
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = os.path.join(self.output_dir, f"evaluation_{'web' if is_web_search else 'doc'}_{timestamp}.json")
-            
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+
             evaluation_data = {
                 "query": query,
                 "answer": answer,
@@ -203,9 +418,25 @@ class EvaluationSystem:
                 "timestamp": timestamp,
                 "source": "web" if is_web_search else "document"
             }
-            
-            with open(output_file, "w") as f:
-                json.dump(evaluation_data, f, indent=2)
+
+            output_file = _write_evaluation_record(self.output_dir, timestamp[:8], evaluation_data)
             logger.info(f"Saved evaluation results to {output_file}")
         except Exception as e:
-            logger.error(f"Error saving evaluation results: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error saving evaluation results: {str(e)}")
+
+_evaluation_system_lock = threading.Lock()
+_evaluation_system = None
+
+def get_evaluation_system() -> EvaluationSystem:
+    """
+    Returns the process-wide EvaluationSystem, creating its Opik client and metric instances on first use only.
+
+    Returns:
+        EvaluationSystem: The shared evaluation system.
+    """
+
+    global _evaluation_system
+    with _evaluation_system_lock:
+        if _evaluation_system is None:
+            _evaluation_system = EvaluationSystem()
+        return _evaluation_system
\ No newline at end of file
@@ -1,18 +1,64 @@
 import json
+import re
+import asyncio
+import hashlib
+import functools
+import numpy as np
 import pandas as pd
 import sqlite3
 import os
 import logging
 import time
-from typing import List, Dict, Any, Tuple
-from groq import Groq
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, repeat
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple, Iterator, AsyncIterator
+from cachetools import LRUCache
+from groq import Groq, AsyncGroq
 from app.config import CONFIG
+from app.utils import get_process_context
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+STREAMABLE_EXTENSIONS = (".xlsx", ".xlsm")
+
+SCHEMA_META_TABLE = "_excel_schema_meta"
+TRANSLATION_CACHE_TABLE = "_sql_translation_cache"
+
+_NON_IDENTIFIER_CHARS = re.compile(r"\W")
+
+_SQL_FENCE = re.compile(r"^```(?:sql)?\s*|\s*```$", re.IGNORECASE)
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+_SQL_TYPES_BY_KIND = {"i": "INTEGER", "u": "INTEGER", "b": "INTEGER", "f": "REAL", "M": "DATETIME"}
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+sqlite3.register_adapter(pd.Timestamp, lambda ts: ts.strftime(DATETIME_FORMAT))
+
+_READ_ONLY_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+})
+
+def _read_only_authorizer(action, arg1, arg2, db_name, trigger_name):
+    """
+    sqlite3 authorizer callback that only allows reading queries.
+
+    Returns:
+        int: SQLITE_OK for SELECT/read/function/recursive-CTE actions, SQLITE_DENY for anything else.
+    """
+
+    return sqlite3.SQLITE_OK if action in _READ_ONLY_ACTIONS else sqlite3.SQLITE_DENY
+
 def detect_table_types(df):
     """
     Detects and maps the data types of DataFrame columns to corresponding SQL data types.
@@ -24,31 +70,234 @@ def detect_table_types(df):
         dict: A dictionary mapping column names to SQL-compatible data types (e.g., INTEGER, REAL, DATETIME, TEXT).
     """
 
-    type_mapping = {}
-    
-    for column in df.columns:
-        if pd.api.types.is_integer_dtype(df[column]):
-            type_mapping[column] = "INTEGER"
-        elif pd.api.types.is_float_dtype(df[column]):
-            type_mapping[column] = "REAL"
-        elif pd.api.types.is_datetime64_any_dtype(df[column]):
-            type_mapping[column] = "DATETIME"
-        else:
-            type_mapping[column] = "TEXT"
-    
-    return type_mapping
+    return {column: _SQL_TYPES_BY_KIND.get(dtype.kind, "TEXT") for column, dtype in df.dtypes.items()}
+
+def _file_sha1(file_path: str) -> str:
+    """
+    Computes the SHA-1 hex digest of a file, reading it in 1 MiB blocks.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: The hex digest.
+    """
+
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _prompt_key(prompt: str) -> str:
+    """
+    Computes the SQL translation cache key for a prompt.
+
+    The prompt already embeds the schema description (including row counts and sample data), so any change
+    to the loaded tables changes the key. Whitespace is normalized and the model name is included.
+
+    Args:
+        prompt (str): The NL-to-SQL prompt.
+
+    Returns:
+        str: A SHA-256 hex digest.
+    """
+
+    return hashlib.sha256(f"{CONFIG['groq']['model']}\0{' '.join(prompt.split())}".encode("utf-8")).hexdigest()
+
+def _open_excel_file(file_path: str) -> pd.ExcelFile:
+    """
+    Opens an Excel workbook once, preferring the Rust-based calamine parser over pandas' default engines.
+
+    Args:
+        file_path (str): Path to the Excel file.
+
+    Returns:
+        pd.ExcelFile: The opened workbook, backed by calamine when `python-calamine` is installed,
+            otherwise by pandas' default engine for the file type.
+    """
+
+    try:
+        return pd.ExcelFile(file_path, engine="calamine")
+    except (ImportError, ValueError) as e:
+        logger.warning(f"Calamine engine unavailable, falling back to default Excel engine: {str(e)}")
+        return pd.ExcelFile(file_path)
+
+def _parse_sheet(file_path: str, sheet_name: str) -> pd.DataFrame:
+    """
+    Parses a single sheet of a workbook. Module-level so it can run in a worker process.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        sheet_name (str): Name of the sheet to parse.
+
+    Returns:
+        pd.DataFrame: The parsed sheet.
+    """
+
+    return _open_excel_file(file_path).parse(sheet_name)
+
+def _iter_sheet_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yields the sheets of a workbook as consecutive DataFrame chunks of at most `chunk_size` rows.
+
+    .xlsx/.xlsm files are streamed row by row with openpyxl's read-only mode, so peak memory is bounded
+    by the chunk size rather than the sheet size. Other formats, or a non-positive `chunk_size`,
+    fall back to parsing each sheet whole with `_open_excel_file`; multi-sheet workbooks are then
+    parsed in parallel across `excel_processing.max_workers` processes, while the caller still
+    consumes (and writes) the sheets one at a time in workbook order.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        chunk_size (int): Maximum number of rows per yielded DataFrame; <= 0 disables streaming.
+
+    Yields:
+        Tuple[str, pd.DataFrame]: The sheet name and a chunk of its rows. Every sheet yields at least one
+            (possibly empty) chunk, and all chunks of a sheet are yielded before the next sheet starts.
+    """
+
+    openpyxl = None
+    if chunk_size > 0 and file_path.lower().endswith(STREAMABLE_EXTENSIONS):
+        try:
+            import openpyxl #type: ignore
+        except ImportError:
+            logger.warning("openpyxl not installed, parsing sheets without streaming")
+
+    if openpyxl is None:
+        excel_file = _open_excel_file(file_path)
+        sheet_names = excel_file.sheet_names
+        max_workers = min(len(sheet_names), CONFIG["excel_processing"].get("max_workers") or os.cpu_count() or 1)
+        if max_workers <= 1:
+            for sheet_name in sheet_names:
+                yield sheet_name, excel_file.parse(sheet_name)
+            return
+
+        excel_file.close()
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_process_context()) as executor:
+            yield from zip(sheet_names, executor.map(_parse_sheet, repeat(file_path), sheet_names))
+        return
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                yield worksheet.title, pd.DataFrame()
+                continue
+
+            columns, seen = [], {}
+            for i, col in enumerate(header):
+                name = f"Unnamed: {i}" if col is None else str(col)
+                if name in seen:
+                    seen[name] += 1
+                    name = f"{name}.{seen[name]}"
+                else:
+                    seen[name] = 0
+                columns.append(name)
+
+            width = len(columns)
+            buffer = []
+            yielded = False
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                buffer.append(tuple(row[:width]) + (None,) * (width - len(row)))
+                if len(buffer) >= chunk_size:
+                    yield worksheet.title, pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+                    yielded = True
+
+            if buffer or not yielded:
+                yield worksheet.title, pd.DataFrame(buffer, columns=columns)
+    finally:
+        workbook.close()
 
 class ExcelToSQLProcessor:
     def __init__(self, db_path="excel_data.sqlite"):
         self.db_path = db_path
         self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.async_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+        self._llm_semaphore = asyncio.Semaphore(CONFIG["excel_processing"].get("max_concurrent_llm_calls", 8))
         self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.text_factory = str
+        self.conn.executescript("""
+            PRAGMA page_size=32768;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-200000;
+            PRAGMA mmap_size=268435456;
+        """)
         self.table_schemas = {}
+        self._load_schema_meta()
+        self._table_info_cache = None
+        self._schema_text_cache = {}
+        cache_size = CONFIG["excel_processing"].get("query_cache_size", 256)
+        self._query_cache = LRUCache(maxsize=cache_size)
+        self._result_cache = LRUCache(maxsize=CONFIG["excel_processing"].get("result_cache_max_rows", 10000), getsizeof=len)
+    
+    def _load_schema_meta(self) -> None:
+        """
+        Creates the schema metadata and SQL translation cache tables if needed and restores `table_schemas`
+        from the metadata, so ingest-time column types and row counts survive restarts.
+        """
+
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS "{SCHEMA_META_TABLE}" (
+                    table_name TEXT PRIMARY KEY,
+                    file_sha1 TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    table_count INTEGER NOT NULL,
+                    columns_json TEXT NOT NULL,
+                    types_json TEXT NOT NULL,
+                    rows INTEGER NOT NULL
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS "{TRANSLATION_CACHE_TABLE}" (
+                    prompt_sha256 TEXT PRIMARY KEY,
+                    sql_query TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+        for row in self.conn.execute(f'SELECT table_name, columns_json, types_json, rows FROM "{SCHEMA_META_TABLE}"'):
+            self.table_schemas[row["table_name"]] = {
+                "columns": json.loads(row["columns_json"]),
+                "types": json.loads(row["types_json"]),
+                "rows": row["rows"]
+            }
+    
+    def _get_ingested_tables(self, file_sha1: str) -> List[str]:
+        """
+        Returns the tables previously created from a file with the given SHA-1, if all of them are still intact.
+
+        Args:
+            file_sha1 (str): SHA-1 hex digest of the workbook.
+
+        Returns:
+            List[str]: The table names in sheet order, or an empty list if the file wasn't ingested or any of
+                its tables has since been replaced by another workbook.
+        """
+
+        rows = self.conn.execute(
+            f'SELECT table_name, table_count FROM "{SCHEMA_META_TABLE}" WHERE file_sha1 = ? ORDER BY position',
+            (file_sha1,)
+        ).fetchall()
+        if not rows or len(rows) != rows[0]["table_count"]:
+            return []
+        return [row["table_name"] for row in rows]
     
     def process_excel_file(self, file_path: str) -> List[str]:
         """
         Processes an Excel file by reading its sheets, sanitizing data, and creating corresponding SQL tables.
 
+        All sheets are written in a single transaction, so the workbook is committed (and synced) once
+        and a failure part-way through leaves the previously loaded tables untouched. A workbook whose
+        SHA-1 matches an earlier ingest whose tables are all still present is not parsed again.
+
         Args:
             file_path (str): Path to the Excel file to be processed.
 
@@ -63,24 +312,57 @@ class ExcelToSQLProcessor:
         start_time = time.time()
         
         try:
-            excel_file = pd.ExcelFile(file_path)
+            file_sha1 = _file_sha1(file_path)
+            table_names = self._get_ingested_tables(file_sha1)
+            if table_names:
+                logger.info(f"Excel file already ingested (sha1 {file_sha1}), reusing tables: {table_names}")
+                return table_names
+            
+            chunk_size = CONFIG["excel_processing"]["chunk_size"]
             table_names = []
+            schemas = {}
             
-            for sheet_name in excel_file.sheet_names:
-                table_name = self._sanitize_table_name(sheet_name)
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                for sheet_name, chunks in groupby(_iter_sheet_chunks(file_path, chunk_size), key=itemgetter(0)):
+                    table_name = self._sanitize_table_name(sheet_name)
+                    row_count = 0
                 
-                df.columns = [self._sanitize_column_name(col) for col in df.columns]
-                self._create_sql_table(df, table_name)
-                table_names.append(table_name)
+                    for i, (_, df) in enumerate(chunks):
+                        if i == 0:
+                            df.columns = [self._sanitize_column_name(col) for col in df.columns]
+                            type_mapping = detect_table_types(df)
+                            self._create_sql_table(df, table_name, type_mapping)
+                            schemas[table_name] = {
+                                "columns": list(df.columns),
+                                "types": type_mapping,
+                                "rows": 0
+                            }
+                        else:
+                            df.columns = schemas[table_name]["columns"]
+                            self._insert_rows(df, table_name)
+                        row_count += len(df)
                 
-                self.table_schemas[table_name] = {
-                    "columns": list(df.columns),
-                    "types": detect_table_types(df),
-                    "rows": len(df)
-                }
+                    schemas[table_name]["rows"] = row_count
+                    table_names.append(table_name)
+                
+                    logger.info(f"Created table '{table_name}' with {row_count} rows and {len(schemas[table_name]['columns'])} columns")
                 
-                logger.info(f"Created table '{table_name}' with {len(df)} rows and {len(df.columns)} columns")
+                unique_tables = list(dict.fromkeys(table_names))
+                self.conn.executemany(
+                    f'INSERT OR REPLACE INTO "{SCHEMA_META_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (
+                            table_name, file_sha1, position, len(unique_tables),
+                            json.dumps(schemas[table_name]["columns"]),
+                            json.dumps(schemas[table_name]["types"]),
+                            schemas[table_name]["rows"]
+                        )
+                        for position, table_name in enumerate(unique_tables)
+                    ]
+                )
+            
+            self.table_schemas.update(schemas)
             
             end_time = time.time()
             logger.info(f"Excel Processing Time: {end_time - start_time:.2f} sec")
@@ -91,7 +373,9 @@ class ExcelToSQLProcessor:
             logger.error(f"Error processing Excel file: {str(e)}", exc_info=True)
             raise
     
-    def _sanitize_table_name(self, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096, typed=True)
+    def _sanitize_table_name(name: str) -> str:
         """
         Sanitizes a string to create a valid SQL table name.
 
@@ -103,12 +387,14 @@ class ExcelToSQLProcessor:
                 prefixed with 'table_' if it doesn't start with a letter or underscore.
         """
 
-        sanitized = ''.join(c if c.isalnum() or c == '_' else '_' for c in name.replace(' ', '_'))
+        sanitized = _NON_IDENTIFIER_CHARS.sub('_', name)
         if sanitized and not (sanitized[0].isalpha() or sanitized[0] == '_'):
             sanitized = 'table_' + sanitized
         return sanitized.lower()
     
-    def _sanitize_column_name(self, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096, typed=True)
+    def _sanitize_column_name(name) -> str:
         """
         Sanitizes a string to create a valid SQL column name.
 
@@ -122,44 +408,85 @@ class ExcelToSQLProcessor:
 
         if isinstance(name, (int, float)):
             return f"col_{name}"
-        sanitized = ''.join(c if c.isalnum() or c == '_' else '_' for c in str(name).replace(' ', '_'))
+        sanitized = _NON_IDENTIFIER_CHARS.sub('_', str(name))
         if sanitized and not (sanitized[0].isalpha() or sanitized[0] == '_'):
             sanitized = 'col_' + sanitized
         return sanitized.lower()
     
-    def _create_sql_table(self, df: pd.DataFrame, table_name: str) -> None:
+    def _create_sql_table(self, df: pd.DataFrame, table_name: str, type_mapping: Dict[str, str] = None) -> None:
         """
-        Creates a SQL table from a DataFrame, mapping columns to appropriate SQL data types.
+        Creates a SQL table from a DataFrame, mapping columns to appropriate SQL data types. The caller owns the transaction.
 
         Args:
             df (pd.DataFrame): The DataFrame to be converted into a SQL table.
             table_name (str): The name of the table to be created in the SQL database.
+            type_mapping (Dict[str, str], optional): Precomputed result of `detect_table_types(df)`; computed here if omitted.
 
         Raises:
             Exception: If an error occurs while creating the table or executing the SQL commands.
         """
 
+        self._invalidate_caches()
         try:
-            type_mapping = detect_table_types(df)
+            if type_mapping is None:
+                type_mapping = detect_table_types(df)
             column_defs = []
             for col in df.columns:
                 column_defs.append(f'"{col}" {type_mapping[col]}')
             
             create_query = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(column_defs)})'
             
-            with self.conn:
-                self.conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-                self.conn.execute(create_query)
-                
-                df.to_sql(table_name, self.conn, if_exists='replace', index=False)
+            self.conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            self.conn.execute(create_query)
+            self._insert_rows(df, table_name)
         except Exception as e:
             logger.error(f"Error creating SQL table: {str(e)}", exc_info=True)
             raise
     
+    def _insert_rows(self, df: pd.DataFrame, table_name: str) -> None:
+        """
+        Inserts the rows of a DataFrame into an existing SQL table. The caller owns the transaction.
+
+        Args:
+            df (pd.DataFrame): The rows to insert, with columns in table order.
+            table_name (str): The name of the target table.
+        """
+
+        self._invalidate_caches()
+        placeholders = ", ".join("?" * len(df.columns))
+        datetime_positions = [i for i, dtype in enumerate(df.dtypes) if dtype.kind == "M"]
+        if datetime_positions:
+            # Format whole datetime columns at once rather than through the per-cell Timestamp adapter.
+            df = df.copy(deep=False)
+            for i in datetime_positions:
+                df.isetitem(i, df.iloc[:, i].dt.strftime(DATETIME_FORMAT))
+        if all(isinstance(dtype, np.dtype) and dtype.kind in "iufb" for dtype in df.dtypes):
+            # Plain numeric columns convert to Python scalars in C via tolist(); SQLite stores a bound NaN as NULL.
+            rows = zip(*(df[col].to_numpy().tolist() for col in df.columns))
+        else:
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        self.conn.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', rows)
+    
+    def _invalidate_caches(self) -> None:
+        """
+        Drops every cache derived from the database contents. Called whenever tables are (re)created or rows are inserted.
+        """
+
+        self._table_info_cache = None
+        self._schema_text_cache = {}
+        self._query_cache.clear()
+        self._result_cache.clear()
+    
     def get_table_info(self) -> Dict[str, Any]:
         """
         Retrieves information about all tables in the database, including columns, data types, sample rows, and row counts.
 
+        The result is cached on the instance and invalidated whenever a table is (re)created or rows are inserted,
+        so repeated natural language queries don't re-read the schema from SQLite. Column names come from the
+        sample query's cursor description, and types and row counts from the ingest-time `table_schemas`, so a
+        table created by this processor costs a single query; the declared types of any other tables are read
+        with one `sqlite_master` x `pragma_table_info` join rather than a PRAGMA per table.
+
         Returns:
             Dict[str, Any]: A dictionary where each key is a table name and each value is another dictionary containing:
                 - "columns": List of column names.
@@ -171,26 +498,39 @@ class ExcelToSQLProcessor:
             Exception: If an error occurs while querying the database.
         """
 
+        if self._table_info_cache is not None:
+            return self._table_info_cache
+        
+        self._schema_text_cache = {}
         tables = {}
         try:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT IN (?, ?);", (SCHEMA_META_TABLE, TRANSLATION_CACHE_TABLE))
             table_names = [row[0] for row in cursor.fetchall()]
             
+            declared_types = {table: schema["types"] for table, schema in self.table_schemas.items()}
+            if any(table not in declared_types for table in table_names):
+                cursor.execute(
+                    "SELECT m.name, p.name, p.type FROM sqlite_master m JOIN pragma_table_info(m.name) p WHERE m.type='table';"
+                )
+                for table, column, dtype in cursor.fetchall():
+                    if table not in self.table_schemas:
+                        declared_types.setdefault(table, {})[column] = dtype
+            
             for table in table_names:
-                cursor.execute(f"PRAGMA table_info('{table}');")
-                columns = cursor.fetchall()
-                
                 cursor.execute(f"SELECT * FROM '{table}' LIMIT 3;")
-                sample_rows = cursor.fetchall()
+                sample_rows = [tuple(row) for row in cursor.fetchall()]
+                column_names = [description[0] for description in cursor.description]
+                column_types = [declared_types.get(table, {}).get(col, "") for col in column_names]
                 
                 tables[table] = {
-                    "columns": [col[1] for col in columns],
-                    "types": [col[2] for col in columns],
+                    "columns": column_names,
+                    "types": column_types,
                     "sample_data": sample_rows,
                     "row_count": self._get_row_count(table)
                 }
             
+            self._table_info_cache = tables
             return tables
         except Exception as e:
             logger.error(f"Error getting table info: {str(e)}", exc_info=True)
@@ -200,6 +540,10 @@ class ExcelToSQLProcessor:
         """
         Gets the row count for a specified table in the database.
 
+        Tables created by this processor (in this or an earlier process, via the persisted schema metadata)
+        return the row count recorded at ingest time; only tables created outside the processor fall back
+        to a `SELECT COUNT(*)` scan.
+
         Args:
             table_name (str): The name of the table for which to count the rows.
 
@@ -210,6 +554,10 @@ class ExcelToSQLProcessor:
             Exception: If an error occurs while querying the database.
         """
 
+        schema = self.table_schemas.get(table_name)
+        if schema is not None and "rows" in schema:
+            return schema["rows"]
+        
         try:
             cursor = self.conn.cursor()
             cursor.execute(f"SELECT COUNT(*) FROM '{table_name}';")
@@ -218,45 +566,352 @@ class ExcelToSQLProcessor:
             logger.error(f"Error counting rows: {str(e)}", exc_info=True)
             return 0
     
-    def translate_to_sql(self, natural_language_query: str) -> str:
+    def _get_schema_text(self, tables: List[str] = None) -> str:
         """
-        Translates a natural language query into a valid SQL query based on the database schema.
+        Builds the schema description sent to the LLM, cached per table selection.
+
+        Each table lists at most `excel_processing.schema_max_columns` columns, and sample rows are only
+        included when the column-only description stays under `excel_processing.schema_sample_char_limit`
+        characters, so wide workbooks don't balloon the prompt.
 
         Args:
-            natural_language_query (str): The natural language query to be translated into SQL.
+            tables (List[str], optional): Restricts the description to these tables. Defaults to all tables.
 
         Returns:
-            str: The translated SQL query, or an error message if the translation fails.
-
-        Raises:
-            Exception: If an error occurs during the translation process, including LLM issues or database retrieval errors.
+            str: The schema description.
         """
 
-        start_time = time.time()
-        logger.info(f"Translating query to SQL: {natural_language_query}")
-    
+        cache_key = frozenset(tables) if tables is not None else None
+        if self._table_info_cache is not None and cache_key in self._schema_text_cache:
+            return self._schema_text_cache[cache_key]
+        
         tables_info = self.get_table_info()
-        schema_desc = []
+        if tables is not None:
+            tables_info = {k: v for k, v in tables_info.items() if k in cache_key}
+        
+        max_columns = CONFIG["excel_processing"].get("schema_max_columns", 40)
+        table_descs = []
         for table_name, info in tables_info.items():
             col_desc = []
-            for col, dtype in zip(info["columns"], info["types"]):
+            for col, dtype in zip(info["columns"][:max_columns], info["types"][:max_columns]):
                 col_desc.append(f"{col} ({dtype})")
+            hidden = len(info["columns"]) - max_columns
+            if hidden > 0:
+                col_desc.append(f"... (+{hidden} more)")
             
-            schema_desc.append(f"Table: {table_name}")
-            schema_desc.append(f"Columns: {', '.join(col_desc)}")
-            schema_desc.append(f"Row count: {info['row_count']}")
-            
-            if info['sample_data']:
+            desc = [f"Table: {table_name}", f"Columns: {', '.join(col_desc)}", f"Row count: {info['row_count']}"]
+            table_descs.append((desc, info['sample_data']))
+        
+        include_samples = sum(len(line) for desc, _ in table_descs for line in desc) <= CONFIG["excel_processing"].get("schema_sample_char_limit", 2000)
+        
+        schema_desc = []
+        for desc, sample_data in table_descs:
+            schema_desc.extend(desc)
+            if include_samples and sample_data:
                 sample_rows = []
-                for row in info['sample_data'][:2]: 
-                    sample_rows.append(", ".join([str(val) for val in row]))
+                for row in sample_data[:2]: 
+                    sample_rows.append(", ".join([str(val) for val in row[:max_columns]]))
                 schema_desc.append(f"Sample data: [{' | '.join(sample_rows)}]")
             
             schema_desc.append("") 
         
         schema_text = "\n".join(schema_desc)
+        if self._table_info_cache is not None:
+            self._schema_text_cache[cache_key] = schema_text
+        return schema_text
+    
+    def translate_to_sql(self, natural_language_query: str, tables: List[str] = None) -> str:
+        """
+        Translates a natural language query into a valid SQL query based on the database schema.
+
+        Args:
+            natural_language_query (str): The natural language query to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            str: The translated SQL query, or an error message if the translation fails.
+
+        Raises:
+            Exception: If an error occurs during the translation process, including LLM issues or database retrieval errors.
+        """
+
+        start_time = time.time()
+        logger.info(f"Translating query to SQL: {natural_language_query}")
+        prompt = self._build_translation_prompt(natural_language_query, tables)
+        prompt_key = _prompt_key(prompt)
+        cached_sql = self._get_cached_translation(prompt_key)
+        if cached_sql is not None:
+            return cached_sql
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=CONFIG["groq"]["model"],
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=500
+            )
+            return self._cache_translation(prompt_key, self._extract_sql(response.choices[0].message.content, start_time))
+            
+        except Exception as e:
+            logger.error(f"Error translating to SQL: {str(e)}", exc_info=True)
+            return f"ERROR: Failed to translate query - {str(e)}"
+    
+    async def atranslate_to_sql(self, natural_language_query: str, tables: List[str] = None) -> str:
+        """
+        Async variant of `translate_to_sql` that awaits the Groq call instead of blocking the event loop.
+
+        Args:
+            natural_language_query (str): The natural language query to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            str: The translated SQL query, or an error message if the translation fails.
+        """
+
+        start_time = time.time()
+        logger.info(f"Translating query to SQL: {natural_language_query}")
+        prompt = self._build_translation_prompt(natural_language_query, tables)
+        prompt_key = _prompt_key(prompt)
+        cached_sql = self._get_cached_translation(prompt_key)
+        if cached_sql is not None:
+            return cached_sql
+        
+        try:
+            async with self._llm_semaphore:
+                response = await self.async_client.chat.completions.create(
+                    model=CONFIG["groq"]["model"],
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=500
+                )
+            return self._cache_translation(prompt_key, self._extract_sql(response.choices[0].message.content, start_time))
+            
+        except Exception as e:
+            logger.error(f"Error translating to SQL: {str(e)}", exc_info=True)
+            return f"ERROR: Failed to translate query - {str(e)}"
+    
+    def translate_many_to_sql(self, natural_language_queries: List[str], tables: List[str] = None) -> List[str]:
+        """
+        Translates several natural language queries to SQL with a single LLM call that sees the schema once.
+
+        Queries already in the translation cache are answered from it; the rest are sent together as a JSON array and
+        each translation is cached under its single-query prompt key, so later `translate_to_sql` calls hit it. If the
+        batched response can't be parsed into one SQL string per query, the pending queries are translated one by one.
+
+        Args:
+            natural_language_queries (List[str]): The natural language queries to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            List[str]: The SQL queries (or "ERROR: ..." messages), in the same order as the input.
+        """
+
+        start_time = time.time()
+        sql_queries, prompt_keys, pending = self._lookup_translations(natural_language_queries, tables)
+        if not pending:
+            return sql_queries
+        
+        prompt = self._build_batch_translation_prompt([natural_language_queries[i] for i in pending], tables)
+        translated = None
+        try:
+            response = self.client.chat.completions.create(
+                model=CONFIG["groq"]["model"],
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=500 * len(pending)
+            )
+            translated = self._parse_batch_sql(response.choices[0].message.content, len(pending))
+        except Exception as e:
+            logger.error(f"Error translating query batch to SQL: {str(e)}", exc_info=True)
+        
+        if translated is None:
+            for i in pending:
+                sql_queries[i] = self.translate_to_sql(natural_language_queries[i], tables)
+        else:
+            for i, sql_query in zip(pending, translated):
+                sql_queries[i] = self._cache_translation(prompt_keys[i], sql_query)
+            end_time = time.time()
+            logger.info(f"Batch SQL Translation Time for {len(pending)} queries: {end_time - start_time:.2f} sec")
+        return sql_queries
+    
+    async def atranslate_many_to_sql(self, natural_language_queries: List[str], tables: List[str] = None) -> List[str]:
+        """
+        Async variant of `translate_many_to_sql`.
+
+        Args:
+            natural_language_queries (List[str]): The natural language queries to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            List[str]: The SQL queries (or "ERROR: ..." messages), in the same order as the input.
+        """
+
+        start_time = time.time()
+        sql_queries, prompt_keys, pending = self._lookup_translations(natural_language_queries, tables)
+        if not pending:
+            return sql_queries
+        
+        prompt = self._build_batch_translation_prompt([natural_language_queries[i] for i in pending], tables)
+        translated = None
+        try:
+            async with self._llm_semaphore:
+                response = await self.async_client.chat.completions.create(
+                    model=CONFIG["groq"]["model"],
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=500 * len(pending)
+                )
+            translated = self._parse_batch_sql(response.choices[0].message.content, len(pending))
+        except Exception as e:
+            logger.error(f"Error translating query batch to SQL: {str(e)}", exc_info=True)
+        
+        if translated is None:
+            fallback = await asyncio.gather(*(self.atranslate_to_sql(natural_language_queries[i], tables) for i in pending))
+            for i, sql_query in zip(pending, fallback):
+                sql_queries[i] = sql_query
+        else:
+            for i, sql_query in zip(pending, translated):
+                sql_queries[i] = self._cache_translation(prompt_keys[i], sql_query)
+            end_time = time.time()
+            logger.info(f"Batch SQL Translation Time for {len(pending)} queries: {end_time - start_time:.2f} sec")
+        return sql_queries
+    
+    def _lookup_translations(self, natural_language_queries: List[str], tables: List[str] = None) -> Tuple[List[str], List[str], List[int]]:
+        """
+        Resolves a batch of queries against the translation cache.
+
+        Args:
+            natural_language_queries (List[str]): The natural language queries to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            Tuple[List[str], List[str], List[int]]: The cached SQL per query (None on a miss), the single-query prompt
+                key per query, and the indices of the queries that still need translating.
+        """
+
+        prompt_keys = [_prompt_key(self._build_translation_prompt(query, tables)) for query in natural_language_queries]
+        sql_queries = [self._get_cached_translation(prompt_key) for prompt_key in prompt_keys]
+        pending = [i for i, sql_query in enumerate(sql_queries) if sql_query is None]
+        return sql_queries, prompt_keys, pending
+    
+    def _build_batch_translation_prompt(self, natural_language_queries: List[str], tables: List[str] = None) -> str:
+        """
+        Builds a prompt asking the LLM to translate several natural language queries at once, returning a JSON array.
+
+        Args:
+            natural_language_queries (List[str]): The natural language queries to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            str: The prompt to send to the LLM.
+        """
+
+        schema_text = self._get_schema_text(tables)
+        
+        return f"""
+        You are an expert SQL developer. Convert each of these natural language queries to a valid SQLite SQL query.
+        
+        Database Schema:
+        {schema_text}
+        
+        Natural Language Queries (JSON array):
+        {json.dumps(natural_language_queries, ensure_ascii=False)}
+        
+        Rules:
+        1. Return ONLY a JSON array of strings, one SQL query per input query, in the same order. Nothing else.
+        2. Use valid SQLite syntax.
+        3. Use double quotes for table and column names.
+        4. Make sure to handle JOINs appropriately if needed.
+        5. If a query cannot be translated, its array element must be "ERROR: " followed by a brief explanation.
         
-        prompt = f"""
+        JSON Array:
+        """
+    
+    def _parse_batch_sql(self, content: str, expected_count: int) -> List[str]:
+        """
+        Parses the LLM's batched translation into one SQL string per query.
+
+        Args:
+            content (str): The raw LLM response content.
+            expected_count (int): The number of queries that were sent.
+
+        Returns:
+            List[str] or None: The SQL queries with any code fences stripped, or None if the response isn't a JSON
+                array of `expected_count` strings.
+        """
+
+        try:
+            parsed = json.loads(_JSON_FENCE.sub("", content.strip()))
+        except ValueError:
+            logger.warning("Batched SQL translation was not valid JSON, falling back to single translations")
+            return None
+        if not isinstance(parsed, list) or len(parsed) != expected_count or not all(isinstance(sql, str) for sql in parsed):
+            logger.warning("Batched SQL translation had an unexpected shape, falling back to single translations")
+            return None
+        return [_SQL_FENCE.sub("", sql.strip()).strip() for sql in parsed]
+    
+    def _get_cached_translation(self, prompt_key: str) -> str:
+        """
+        Looks up a previously generated SQL query for an identical translation prompt.
+
+        Args:
+            prompt_key (str): The `_prompt_key` of the translation prompt.
+
+        Returns:
+            str or None: The cached SQL query, or None on a miss.
+        """
+
+        try:
+            row = self.conn.execute(
+                f'SELECT sql_query FROM "{TRANSLATION_CACHE_TABLE}" WHERE prompt_sha256 = ?', (prompt_key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading SQL translation cache: {str(e)}")
+            return None
+        if row is None:
+            return None
+        logger.info(f"SQL translation cache hit: {row['sql_query']}")
+        return row["sql_query"]
+    
+    def _cache_translation(self, prompt_key: str, sql_query: str) -> str:
+        """
+        Stores a generated SQL query for its translation prompt. "ERROR: ..." translations are not cached.
+
+        Args:
+            prompt_key (str): The `_prompt_key` of the translation prompt.
+            sql_query (str): The SQL query extracted from the LLM response.
+
+        Returns:
+            str: `sql_query`, unchanged.
+        """
+
+        if sql_query.startswith("ERROR:"):
+            return sql_query
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f'INSERT OR REPLACE INTO "{TRANSLATION_CACHE_TABLE}" VALUES (?, ?, ?)',
+                    (prompt_key, sql_query, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing SQL translation cache: {str(e)}")
+        return sql_query
+    
+    def _build_translation_prompt(self, natural_language_query: str, tables: List[str] = None) -> str:
+        """
+        Builds the NL-to-SQL prompt for the given query and table selection.
+
+        Args:
+            natural_language_query (str): The natural language query to be translated into SQL.
+            tables (List[str], optional): Restricts the schema shown to the LLM to these tables. Defaults to all tables.
+
+        Returns:
+            str: The prompt to send to the LLM.
+        """
+
+        schema_text = self._get_schema_text(tables)
+        
+        return f"""
         You are an expert SQL developer. Convert this natural language query to a valid SQLite SQL query.
         
         Database Schema:
@@ -273,40 +928,39 @@ class ExcelToSQLProcessor:
         
         SQL Query:
         """
+    
+    def _extract_sql(self, content: str, start_time: float) -> str:
+        """
+        Strips Markdown code fences from the LLM's translation and logs the outcome.
+
+        Args:
+            content (str): The raw LLM response content.
+            start_time (float): When the translation started, for timing logs.
+
+        Returns:
+            str: The SQL query, or the LLM's "ERROR: ..." message if it couldn't translate the query.
+        """
+
+        sql_query = _SQL_FENCE.sub("", content.strip()).strip()
         
-        try:
-            response = self.client.chat.completions.create(
-                model=CONFIG["groq"]["model"],
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=500
-            )
-            
-            sql_query = response.choices[0].message.content.strip()
-            if sql_query.startswith("```sql"):
-                sql_query = sql_query[6:]  
-            if sql_query.endswith("```"):
-                sql_query = sql_query[:-3]
-            sql_query = sql_query.strip()
-            
-            if sql_query.startswith("ERROR:"):
-                logger.warning(f"LLM couldn't translate query: {sql_query}")
-                return sql_query
-                
-            end_time = time.time()
-            logger.info(f"SQL Translation Time: {end_time - start_time:.2f} sec")
-            logger.info(f"Generated SQL: {sql_query}")
-            
+        if sql_query.startswith("ERROR:"):
+            logger.warning(f"LLM couldn't translate query: {sql_query}")
             return sql_query
             
-        except Exception as e:
-            logger.error(f"Error translating to SQL: {str(e)}", exc_info=True)
-            return f"ERROR: Failed to translate query - {str(e)}"
+        end_time = time.time()
+        logger.info(f"SQL Translation Time: {end_time - start_time:.2f} sec")
+        logger.info(f"Generated SQL: {sql_query}")
+        
+        return sql_query
     
     def execute_sql_query(self, sql_query: str) -> Tuple[List[Dict[str, Any]], str]:
         """
         Executes a SQL query on the database and returns the results as a list of dictionaries.
 
+        LLM-generated SQL runs under a read-only authorizer, so anything other than a query (INSERT, DROP,
+        PRAGMA, ATTACH, ...) is rejected by SQLite while the statement is being prepared, before any row is
+        touched, and the error is passed on to the formatter. Successful results are cached until the next ingest.
+
         Args:
             sql_query (str): The SQL query to be executed.
 
@@ -325,19 +979,20 @@ class ExcelToSQLProcessor:
         if sql_query.startswith("ERROR:"):
             return [], sql_query
         
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(sql_query)
+        if sql_query in self._result_cache:
+            logger.info("SQL result cache hit")
+            return self._result_cache[sql_query], ""
         
-            column_names = [description[0] for description in cursor.description] if cursor.description else []
-            rows = cursor.fetchall()
-        
-            results = []
-            for row in rows:
-                result_dict = {}
-                for i, col in enumerate(column_names):
-                    result_dict[col] = row[i]
-                results.append(result_dict)
+        try:
+            self.conn.set_authorizer(_read_only_authorizer)
+            try:
+                cursor = self.conn.cursor()
+                cursor.execute(sql_query)
+                results = [dict(row) for row in cursor.fetchall()]
+            finally:
+                self.conn.set_authorizer(None)
+            if len(results) <= self._result_cache.maxsize:
+                self._result_cache[sql_query] = results
             
             end_time = time.time()
             logger.info(f"SQL Execution Time: {end_time - start_time:.2f} sec")
@@ -367,8 +1022,135 @@ class ExcelToSQLProcessor:
             Exception: If an error occurs during the response formatting process, such as issues with the LLM API or data handling.
         """
 
+        templated = self._format_trivial(results, error)
+        if templated is not None:
+            return templated
+        
         start_time = time.time()
+        prompt = self._build_format_prompt(natural_language_query, sql_query, results, error)
         
+        try:
+            response = self.client.chat.completions.create(
+                model=CONFIG["groq"]["model"],
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=1000
+            )
+            
+            formatted_response = response.choices[0].message.content.strip()
+            
+            end_time = time.time()
+            logger.info(f"Response Formatting Time: {end_time - start_time:.2f} sec")
+            
+            return formatted_response
+            
+        except Exception as e:
+            logger.error(f"Error formatting response: {str(e)}", exc_info=True)
+            return self._format_fallback(results, error)
+    
+    async def aformat_result_with_llm(self, natural_language_query: str, sql_query: str, results: List[Dict[str, Any]], error: str = "") -> str:
+        """
+        Async variant of `format_result_with_llm` that awaits the Groq call instead of blocking the event loop.
+
+        Args:
+            natural_language_query (str): The original natural language query from the user.
+            sql_query (str): The SQL query generated from the natural language query.
+            results (List[Dict[str, Any]]): The result set returned from executing the SQL query.
+            error (str, optional): An error message if the SQL query failed. Defaults to an empty string.
+
+        Returns:
+            str: A natural language response based on the results of the SQL query, or an explanation in case of errors or empty results.
+        """
+
+        templated = self._format_trivial(results, error)
+        if templated is not None:
+            return templated
+        
+        start_time = time.time()
+        prompt = self._build_format_prompt(natural_language_query, sql_query, results, error)
+        
+        try:
+            async with self._llm_semaphore:
+                response = await self.async_client.chat.completions.create(
+                    model=CONFIG["groq"]["model"],
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=1000
+                )
+            
+            formatted_response = response.choices[0].message.content.strip()
+            
+            end_time = time.time()
+            logger.info(f"Response Formatting Time: {end_time - start_time:.2f} sec")
+            
+            return formatted_response
+            
+        except Exception as e:
+            logger.error(f"Error formatting response: {str(e)}", exc_info=True)
+            return self._format_fallback(results, error)
+    
+    async def astream_format_result_with_llm(self, natural_language_query: str, sql_query: str, results: List[Dict[str, Any]], error: str = "") -> AsyncIterator[str]:
+        """
+        Streaming variant of `aformat_result_with_llm` that yields the response text as Groq produces it,
+        so callers can show the first tokens instead of waiting for the whole completion.
+
+        Args:
+            natural_language_query (str): The original natural language query from the user.
+            sql_query (str): The SQL query generated from the natural language query.
+            results (List[Dict[str, Any]]): The result set returned from executing the SQL query.
+            error (str, optional): An error message if the SQL query failed. Defaults to an empty string.
+
+        Yields:
+            str: Successive pieces of the response. If the LLM call fails before producing any text, the
+                plain fallback response is yielded instead.
+        """
+
+        templated = self._format_trivial(results, error)
+        if templated is not None:
+            yield templated
+            return
+        
+        start_time = time.time()
+        prompt = self._build_format_prompt(natural_language_query, sql_query, results, error)
+        streamed = False
+        
+        try:
+            async with self._llm_semaphore:
+                stream = await self.async_client.chat.completions.create(
+                    model=CONFIG["groq"]["model"],
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=1000,
+                    stream=True
+                )
+                async for chunk in stream:
+                    token = chunk.choices[0].delta.content if chunk.choices else None
+                    if token:
+                        streamed = True
+                        yield token
+            
+            end_time = time.time()
+            logger.info(f"Response Formatting Time (streamed): {end_time - start_time:.2f} sec")
+            
+        except Exception as e:
+            logger.error(f"Error streaming formatted response: {str(e)}", exc_info=True)
+            if not streamed:
+                yield self._format_fallback(results, error)
+    
+    def _build_format_prompt(self, natural_language_query: str, sql_query: str, results: List[Dict[str, Any]], error: str = "") -> str:
+        """
+        Builds the prompt asking the LLM to explain a query's results (or its failure) in natural language.
+
+        Args:
+            natural_language_query (str): The original natural language query from the user.
+            sql_query (str): The SQL query generated from the natural language query.
+            results (List[Dict[str, Any]]): The result set returned from executing the SQL query.
+            error (str, optional): An error message if the SQL query failed. Defaults to an empty string.
+
+        Returns:
+            str: The prompt to send to the LLM.
+        """
+
         if error:
             prompt = f"""
             You are a helpful AI assistant with SQL expertise.
@@ -394,7 +1176,7 @@ class ExcelToSQLProcessor:
             Please explain this in a natural way to the user.
             """
         else:
-            results_str = json.dumps(results[:5], indent=2) 
+            results_str = json.dumps(results[:5], separators=(",", ":"), default=str)
             total_results = len(results)
             
             prompt = f"""
@@ -413,36 +1195,71 @@ class ExcelToSQLProcessor:
             Ensure your response is helpful and directly addresses the user's question.
             """
         
-        try:
-            response = self.client.chat.completions.create(
-                model=CONFIG["groq"]["model"],
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            formatted_response = response.choices[0].message.content.strip()
-            
-            end_time = time.time()
-            logger.info(f"Response Formatting Time: {end_time - start_time:.2f} sec")
-            
-            return formatted_response
-            
-        except Exception as e:
-            logger.error(f"Error formatting response: {str(e)}", exc_info=True)
-            if error:
-                return f"Error in SQL query: {error}"
-            elif not results:
-                return "The query executed successfully but didn't return any results."
-            else:
-                return f"Found {len(results)} results, but couldn't format the response."
+        return prompt
     
-    def process_natural_language_query(self, query: str) -> str:
+    def _format_trivial(self, results: List[Dict[str, Any]], error: str = "") -> str:
+        """
+        Renders small, all-scalar result sets without calling the LLM. A single value becomes "column: value" and up to
+        `excel_processing.template_max_rows` rows become a markdown table; anything else is left to the LLM.
+
+        Args:
+            results (List[Dict[str, Any]]): The result set returned from executing the SQL query.
+            error (str, optional): An error message if the SQL query failed. Defaults to an empty string.
+
+        Returns:
+            str or None: The templated response, or None if the results need the LLM to explain them.
+        """
+
+        max_rows = CONFIG["excel_processing"].get("template_max_rows", 3)
+        if error or not results or len(results) > max_rows:
+            return None
+        if not all(isinstance(value, _SCALAR_TYPES) for row in results for value in row.values()):
+            return None
+        
+        if len(results) == 1 and len(results[0]) == 1:
+            (key, value), = results[0].items()
+            return f"{key}: {value}"
+        
+        columns = list(results[0].keys())
+        lines = [
+            "| " + " | ".join(columns) + " |",
+            "| " + " | ".join("---" for _ in columns) + " |",
+        ]
+        lines.extend(
+            "| " + " | ".join(str(row.get(column, "")).replace("|", "\\|") for column in columns) + " |"
+            for row in results
+        )
+        return "\n".join(lines)
+    
+    def _format_fallback(self, results: List[Dict[str, Any]], error: str = "") -> str:
+        """
+        Returns a plain response for when the formatting LLM call fails.
+
+        Args:
+            results (List[Dict[str, Any]]): The result set returned from executing the SQL query.
+            error (str, optional): An error message if the SQL query failed. Defaults to an empty string.
+
+        Returns:
+            str: A short description of the error or result count.
+        """
+
+        if error:
+            return f"Error in SQL query: {error}"
+        elif not results:
+            return "The query executed successfully but didn't return any results."
+        else:
+            return f"Found {len(results)} results, but couldn't format the response."
+    
+    def process_natural_language_query(self, query: str, tables: List[str] = None) -> str:
         """
         Processes a natural language query by translating it to SQL, executing the query, and formatting the results.
 
+        Successful responses are memoized per (table selection, whitespace-normalized query) until the next ingest,
+        so repeated questions skip both LLM calls.
+
         Args:
             query (str): The natural language query to be processed.
+            tables (List[str], optional): Restricts the query to these tables. Defaults to all tables.
 
         Returns:
             str: A natural language response generated by the LLM based on the SQL query results, or an error explanation if any issues occurred.
@@ -451,12 +1268,109 @@ class ExcelToSQLProcessor:
             Exception: If any error occurs during the query translation, execution, or response formatting.
         """
 
-        sql_query = self.translate_to_sql(query)
+        cache_key = (frozenset(tables) if tables is not None else None, " ".join(query.split()))
+        cached_response = self._query_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Query cache hit for: {query}")
+            return cached_response
+        
+        sql_query = self.translate_to_sql(query, tables)
         results, error = self.execute_sql_query(sql_query)
         response = self.format_result_with_llm(query, sql_query, results, error)
+        if not error:
+            self._query_cache[cache_key] = response
+        return response
+    
+    async def aprocess_natural_language_query(self, query: str, tables: List[str] = None) -> str:
+        """
+        Async variant of `process_natural_language_query`. Both Groq calls are awaited so the event loop keeps
+        serving other requests; the SQL itself still runs inline on the processor's connection, which is
+        bound to the thread that created it.
+
+        Args:
+            query (str): The natural language query to be processed.
+            tables (List[str], optional): Restricts the query to these tables. Defaults to all tables.
+
+        Returns:
+            str: A natural language response generated by the LLM based on the SQL query results, or an error explanation if any issues occurred.
+        """
+
+        cache_key = (frozenset(tables) if tables is not None else None, " ".join(query.split()))
+        cached_response = self._query_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Query cache hit for: {query}")
+            return cached_response
+        
+        sql_query = await self.atranslate_to_sql(query, tables)
+        results, error = self.execute_sql_query(sql_query)
+        response = await self.aformat_result_with_llm(query, sql_query, results, error)
+        if not error:
+            self._query_cache[cache_key] = response
         return response
     
+    async def astream_natural_language_query(self, query: str, tables: List[str] = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of `aprocess_natural_language_query`: translates and executes the query, then yields
+        the formatted response as it is generated. Cached responses are yielded in one piece.
+
+        Args:
+            query (str): The natural language query to be processed.
+            tables (List[str], optional): Restricts the query to these tables. Defaults to all tables.
+
+        Yields:
+            str: Successive pieces of the natural language response.
+        """
+
+        cache_key = (frozenset(tables) if tables is not None else None, " ".join(query.split()))
+        cached_response = self._query_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Query cache hit for: {query}")
+            yield cached_response
+            return
+        
+        sql_query = await self.atranslate_to_sql(query, tables)
+        results, error = self.execute_sql_query(sql_query)
+        pieces = []
+        async for piece in self.astream_format_result_with_llm(query, sql_query, results, error):
+            pieces.append(piece)
+            yield piece
+        if not error:
+            self._query_cache[cache_key] = "".join(pieces).strip()
+    
+    async def aprocess_natural_language_queries(self, queries: List[str], tables: List[str] = None) -> List[str]:
+        """
+        Processes several natural language queries together: uncached queries are translated to SQL in one batched
+        LLM call, then their results are formatted concurrently, bounded by `excel_processing.max_concurrent_llm_calls`
+        in-flight Groq requests.
+
+        Args:
+            queries (List[str]): The natural language queries to be processed.
+            tables (List[str], optional): Restricts the queries to these tables. Defaults to all tables.
+
+        Returns:
+            List[str]: The responses, in the same order as `queries`.
+        """
+
+        cache_keys = [(frozenset(tables) if tables is not None else None, " ".join(query.split())) for query in queries]
+        responses = [self._query_cache.get(cache_key) for cache_key in cache_keys]
+        pending = [i for i, response in enumerate(responses) if response is None]
+        if not pending:
+            return responses
+        
+        sql_queries = await self.atranslate_many_to_sql([queries[i] for i in pending], tables)
+        executed = [self.execute_sql_query(sql_query) for sql_query in sql_queries]
+        formatted = await asyncio.gather(*(
+            self.aformat_result_with_llm(queries[i], sql_query, results, error)
+            for i, sql_query, (results, error) in zip(pending, sql_queries, executed)
+        ))
+        for i, (_, error), response in zip(pending, executed, formatted):
+            responses[i] = response
+            if not error:
+                self._query_cache[cache_keys[i]] = response
+        return responses
+    
     def close(self):
+        self._invalidate_caches()
         if self.conn:
             self.conn.close()
 
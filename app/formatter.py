@@ -1,7 +1,39 @@
 import logging
+from app.config import CONFIG
 
 logger = logging.getLogger(__name__)
 
+PREVIEW_LENGTH = CONFIG["formatter"]["chunk_preview_length"]
+
+ANSWER_PREFIX = "Answer: "
+
+def format_citations(chunks, metadatas):
+    """
+    Formats the citation block that `format_response` appends after the answer.
+
+    Args:
+        chunks (List[str]): A list of text chunks relevant to the query.
+        metadatas (List[Dict[str, str]]): Metadata associated with each chunk, typically containing the source of the chunk.
+
+    Returns:
+        str: The citations, starting with the blank line that separates them from the answer.
+    """
+
+    if len(metadatas) < len(chunks):
+        logger.warning(f"Metadata length ({len(metadatas)}) is less than chunks length ({len(chunks)})")
+        metadatas.extend([{"source": "Unknown Source"} for _ in range(len(chunks) - len(metadatas))])
+    
+    try:
+        citations_text = "\n".join(
+            f"[Doc {i}] ({meta.get('source', 'Unknown Source')}): {chunk[:PREVIEW_LENGTH]}{'...' if len(chunk) > PREVIEW_LENGTH else ''}"
+            for i, (chunk, meta) in enumerate(zip(chunks, metadatas), start=1)
+        )
+    except Exception as e:
+        logger.error(f"Error formatting citations: {str(e)}")
+        citations_text = "\n".join(f"[Doc {i}] (Error formatting citation)" for i in range(1, len(chunks) + 1))
+    
+    return f"\n\nCitations:\n{citations_text}"
+
 def format_response(answer, chunks, metadatas):
     """
     Formats the response by including the answer along with citations from the provided chunks and metadata.
@@ -20,27 +52,11 @@ def format_response(answer, chunks, metadatas):
 
     logger.info(f"Formatting response with {len(chunks)} chunks and {len(metadatas)} metadatas")
     
-    if len(metadatas) < len(chunks):
-        logger.warning(f"Metadata length ({len(metadatas)}) is less than chunks length ({len(chunks)})")
-        metadatas.extend([{"source": "Unknown Source"} for _ in range(len(chunks) - len(metadatas))])
-    
-    citations = []
-    for i, (chunk, meta) in enumerate(zip(chunks, metadatas)):
-        try:
-            source = meta.get('source', 'Unknown Source')
-            chunk_preview = chunk[:100] + "..." if len(chunk) > 100 else chunk
-            citation = f"[Doc {i+1}] ({source}): {chunk_preview}"
-            citations.append(citation)
-        except Exception as e:
-            logger.error(f"Error formatting citation {i}: {str(e)}")
-            citations.append(f"[Doc {i+1}] (Error formatting citation)")
-
-    citations_text = "\n".join(citations)
+    if not chunks:
+        logger.info(f"Final formatted response length: {len(answer)}")
+        return answer
     
-    if citations:
-        formatted_response = f"Answer: {answer}\n\nCitations:\n{citations_text}"
-    else:
-        formatted_response = answer
+    formatted_response = f"{ANSWER_PREFIX}{answer}{format_citations(chunks, metadatas)}"
     
     logger.info(f"Final formatted response length: {len(formatted_response)}")
     return formatted_response
\ No newline at end of file
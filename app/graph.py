@@ -2,13 +2,18 @@ from typing import TypedDict, Annotated
 from langgraph.graph import StateGraph, END #type: ignore
 from langchain_core.messages import AIMessage
 import logging
-from app.rag import RAGSystem
-from app.web_search import WebSearchAgent
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from app.rag import get_rag_system
+from app.web_search import get_web_agent
 from app.config import CONFIG
-from app.evaluation import EvaluationSystem
+from app.cache import get_cached_response, set_cached_response
+from app.evaluation import get_evaluation_system
 
 logger = logging.getLogger(__name__)
 
+_SPECULATIVE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-web")
+
 class AgentState(TypedDict):
     query: str
     doc_answer: dict
@@ -39,7 +44,71 @@ def doc_retrieval_node(state: AgentState) -> AgentState:
     """
 
     logger.info(f"Document Retrieval Node: Processing query: {state['query']}")
-    rag_system = RAGSystem(sds_paths=state["sds_paths"])
+    doc_answer, confidence = _query_documents(state)
+    return {
+        "doc_answer": doc_answer,
+        "confidence": confidence,
+        "final_answer": doc_answer,
+        "evaluation_metrics": state.get("evaluation_metrics", {}),
+        "evaluate_metrics": state["evaluate_metrics"]
+    }
+
+def parallel_retrieval_node(state: AgentState) -> AgentState:
+    """
+    Parallel Retrieval Node function that speculatively runs the web search alongside document retrieval.
+
+    Used as the graph's entry point instead of `doc_retrieval_node` when `agent.speculative_web` is enabled, so a
+    low-confidence document answer doesn't pay for a second, sequential retrieval round-trip.
+
+    Args:
+        state (AgentState): The current state of the agent containing the query, paths for document retrieval, and other relevant data.
+
+    Returns:
+        AgentState: A new state object with the document answer, its confidence and, if the confidence is below the
+            threshold, the web answer for `web_search_node` to pick up.
+
+    Notes:
+        - The web search is submitted to a background pool before the document query starts.
+        - If the document confidence meets the threshold, the web search is cancelled (or its result discarded
+          if it is already running); otherwise the node waits for it.
+    """
+
+    logger.info(f"Parallel Retrieval Node: Processing query: {state['query']}")
+    web_future = _SPECULATIVE_POOL.submit(_search_web, state["query"])
+    try:
+        doc_answer, confidence = _query_documents(state)
+    except Exception:
+        web_future.cancel()
+        raise
+
+    web_answer = state.get("web_answer", {})
+    if confidence >= CONFIG["agent"]["confidence_threshold"]:
+        web_future.cancel()
+    else:
+        web_answer = web_future.result()
+        logger.info("Parallel Retrieval Node: Using speculative web search result")
+
+    return {
+        "doc_answer": doc_answer,
+        "confidence": confidence,
+        "web_answer": web_answer,
+        "final_answer": doc_answer,
+        "evaluation_metrics": state.get("evaluation_metrics", {}),
+        "evaluate_metrics": state["evaluate_metrics"]
+    }
+
+def _query_documents(state: AgentState) -> tuple:
+    """
+    Queries the RAG system over the state's documents and shapes the response into the graph's document answer format.
+
+    Args:
+        state (AgentState): The current state of the agent containing the query and document paths.
+
+    Returns:
+        tuple: The document answer dict and its confidence score.
+    """
+
+    rag_system = get_rag_system(state["sds_paths"])
     response = rag_system.query(state["query"])
     if isinstance(response, tuple):
         answer, confidence = response
@@ -55,15 +124,8 @@ def doc_retrieval_node(state: AgentState) -> AgentState:
             "metadata": response.get("metadata", {})
         }
         confidence = response.get("confidence", 0.0)
-    logger.info(f"Document Retrieval Node: Confidence: {confidence:.2f}")
-    return {
-        "doc_answer": doc_answer,
-        "confidence": confidence,
-        "web_answer": state.get("web_answer", {}),
-        "final_answer": doc_answer,
-        "evaluation_metrics": state.get("evaluation_metrics", {}),
-        "evaluate_metrics": state["evaluate_metrics"]
-    }
+    logger.info(f"Document Retrieval: Confidence: {confidence:.2f}")
+    return doc_answer, confidence
 
 def web_search_node(state: AgentState) -> AgentState:
     """
@@ -85,15 +147,7 @@ def web_search_node(state: AgentState) -> AgentState:
     """
 
     logger.info(f"Web Search Node: Processing query: {state['query']}")
-    web_agent = WebSearchAgent()
-    response = web_agent.search_web(state["query"])
-    web_answer = {
-        "answer": response["answer"],
-        "source": "web",
-        "metadata": response.get("metadata", {}),
-        "ground_truth": response.get("ground_truth", []),
-        "sources": response.get("sources", [])
-    }
+    web_answer = state.get("web_answer") or _search_web(state["query"])
     return {
         "web_answer": web_answer,
         "final_answer": web_answer,
@@ -101,6 +155,26 @@ def web_search_node(state: AgentState) -> AgentState:
         "evaluate_metrics": state["evaluate_metrics"]
     }
 
+def _search_web(query: str) -> dict:
+    """
+    Runs a web search for the query and shapes the response into the graph's web answer format.
+
+    Args:
+        query (str): The query to search the web for.
+
+    Returns:
+        dict: The web answer with its answer text, metadata, ground truth and sources.
+    """
+
+    response = get_web_agent().search_web(query)
+    return {
+        "answer": response["answer"],
+        "source": "web",
+        "metadata": response.get("metadata", {}),
+        "ground_truth": response.get("ground_truth", []),
+        "sources": response.get("sources", [])
+    }
+
 def evaluation_node(state: AgentState) -> AgentState:
     """
     Evaluation Node function for evaluating the response to a query, based on the provided answer and ground truth.
@@ -122,7 +196,7 @@ def evaluation_node(state: AgentState) -> AgentState:
     """
 
     logger.info(f"Evaluation Node: Evaluating response for query: {state['query']}")
-    evaluator = EvaluationSystem()
+    evaluator = get_evaluation_system()
     ground_truth = state["final_answer"].get("ground_truth", []) if state["final_answer"]["source"] == "web" else []
     is_web_search = state["final_answer"]["source"] == "web"
     metrics = evaluator.evaluate_response(
@@ -182,11 +256,15 @@ def coordinator_node(state: AgentState) -> str:
     logger.info("Coordinator Node: Triggering Web Search")
     return "web_search"
 
+@functools.lru_cache(maxsize=1)
 def build_graph():
     """
     Builds the agent's workflow graph, which defines the sequence of processing steps and conditions for transitions between nodes.
     The graph starts with document retrieval and uses a coordinator node to determine whether to proceed with a web search or directly evaluate the results. 
-    The flow also includes an evaluation node and an end node.
+    The flow also includes an evaluation node and an end node. With `agent.speculative_web` enabled, the entry point is the
+    parallel retrieval node, which has already fetched the web answer by the time the coordinator routes to web search.
+
+    The graph only depends on the (frozen) configuration, so it is compiled once and shared by all queries.
 
     Returns:
         StateGraph: The compiled state graph defining the workflow of the agent.
@@ -194,7 +272,8 @@ def build_graph():
 
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("doc_retrieval", doc_retrieval_node)
+    retrieval_node = parallel_retrieval_node if CONFIG["agent"].get("speculative_web", False) else doc_retrieval_node
+    workflow.add_node("doc_retrieval", retrieval_node)
     workflow.add_node("web_search", web_search_node)
     workflow.add_node("evaluation_node", evaluation_node)
     workflow.add_node("end_node", end_node)
@@ -228,8 +307,26 @@ def run_agent_workflow(query: str, sds_paths: list, evaluate_metrics: bool = Fal
 
     Returns:
         dict: A dictionary containing the final answer, metadata, and evaluation metrics.
+
+    Cache Logic:
+        Final answers are written through to the response cache under the 'agent' query type, keyed by the query
+        and document paths, so a repeated query returns the cached answer without running the graph. The 'agent'
+        entries are kept apart from RAGSystem's document-only answers, so neither can serve the other.
     """
 
+    context = {"sds_paths": sds_paths} if sds_paths else None
+    cached_response = get_cached_response(query, "agent", context)
+    if cached_response:
+        logger.info(f"Cache hit for agent workflow query: {query}, paths: {sds_paths}")
+        return {
+            "answer": cached_response,
+            "source": "cache",
+            "metadata": {},
+            "ground_truth": [],
+            "metrics": {},
+            "sources": []
+        }
+
     graph = build_graph()
     initial_state = {
         "query": query,
@@ -244,4 +341,5 @@ def run_agent_workflow(query: str, sds_paths: list, evaluate_metrics: bool = Fal
     result = graph.invoke(initial_state)
     final_answer = result["final_answer"]
     logger.info(f"Final answer: {final_answer['answer'][:100]}...")
+    set_cached_response(query, final_answer["answer"], "agent", context)
     return final_answer
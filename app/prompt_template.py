@@ -1,33 +1,38 @@
-from langchain.prompts import PromptTemplate
+# The rules are sent as a constant system message ahead of the per-query context, so every
+# request shares the same prompt prefix and Groq can reuse it instead of re-reading it.
+DOC_SYSTEM_PROMPT = (
+    "You are an AI assistant specialized in answering questions from structured and unstructured documents, "
+    "including research papers, safety data sheets, and documents containing tables or lists.\n\n"
+    "Follow these rules:\n"
+    "- If the answer is **explicitly** found in the provided documents, provide it with relevant context.\n"
+    "- If the answer is in **tabular format**, summarize key values and structure them in a readable way.\n"
+    "- If there are **multiple conflicting sources**, mention them with reasoning.\n"
+    "- If the answer is **not found**, say: 'The answer is not present in the given documents.'\n"
+    "- **Do not generate answers beyond the given data**."
+)
+
+DOC_USER_TEMPLATE = (
+    "**Context:**\n{retrieved_documents}\n\n"
+    "**User Query:** {query}\n\n"
+    "**Answer:**"
+)
+
+# Plain str.format for the per-query hot path. The result is only the user message: send it after the system prompt.
+format_doc_prompt = DOC_USER_TEMPLATE.format
+
+WEB_SYSTEM_PROMPT = (
+    "You are an AI assistant tasked with answering questions based on web search results.\n\n"
+    "Follow these rules:\n"
+    "- Summarize the relevant information from the provided web content.\n"
+    "- If the answer is **not found**, say: 'I couldn't find a definitive answer based on available web information.'\n"
+    "- Provide a concise and accurate response based only on the given web content.\n"
+    "- Do not make up information beyond what is provided."
+)
 
-doc_prompt_template = PromptTemplate(
-    input_variables=["retrieved_documents", "query"],
-    template=(
-        "You are an AI assistant specialized in answering questions from structured and unstructured documents, "
-        "including research papers, safety data sheets, and documents containing tables or lists.\n\n"
-        "Follow these rules:\n"
-        "- If the answer is **explicitly** found in the provided documents, provide it with relevant context.\n"
-        "- If the answer is in **tabular format**, summarize key values and structure them in a readable way.\n"
-        "- If there are **multiple conflicting sources**, mention them with reasoning.\n"
-        "- If the answer is **not found**, say: 'The answer is not present in the given documents.'\n"
-        "- **Do not generate answers beyond the given data**.\n\n"
-        "**Context:**\n{retrieved_documents}\n\n"
-        "**User Query:** {query}\n\n"
-        "**Answer:**"
-    ),  
+WEB_USER_TEMPLATE = (
+    "**Web Content:**\n{web_content}\n\n"
+    "**User Query:** {query}\n\n"
+    "**Answer:**"
 )
 
-web_prompt_template = PromptTemplate(
-    input_variables=["web_content", "query"],
-    template=(
-        "You are an AI assistant tasked with answering questions based on web search results.\n\n"
-        "Follow these rules:\n"
-        "- Summarize the relevant information from the provided web content.\n"
-        "- If the answer is **not found**, say: 'I couldn't find a definitive answer based on available web information.'\n"
-        "- Provide a concise and accurate response based only on the given web content.\n"
-        "- Do not make up information beyond what is provided.\n\n"
-        "**Web Content:**\n{web_content}\n\n"
-        "**User Query:** {query}\n\n"
-        "**Answer:**"
-    ),
-)
\ No newline at end of file
+format_web_prompt = WEB_USER_TEMPLATE.format
\ No newline at end of file
@@ -1,17 +1,25 @@
-from typing import List, Tuple
+from typing import List, Tuple, Iterator
 import os
 import time
 import logging
-import json
-from rank_bm25 import BM25Okapi
+import re
+import hashlib
+import orjson
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import faiss
+import numpy as np
 from groq import Groq
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from app.utils import load_sds, preprocess_text
+from app.utils import load_sds, preprocess_text, get_process_context
 from app.cache import get_cached_response, set_cached_response
-from app.reranker import rerank_chunks
-from app.formatter import format_response
-from app.prompt_template import doc_prompt_template
+from app.reranker import rerank_chunks, rerank_chunks_batched, bm25_scores, tokenize
+from app.formatter import format_response, format_citations, ANSWER_PREFIX
+from app.embeddings import get_embedding_model, describe_embedding_model
+from app.prompt_template import DOC_SYSTEM_PROMPT, format_doc_prompt
 from dotenv import load_dotenv
 from app.config import CONFIG
 
@@ -23,18 +31,118 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_JSON_START = re.compile(r"\s*[\[{]")
+
+NOT_FOUND_ANSWER = "The answer is not present in the given documents."
+
+def _load_chunks(path: str) -> Tuple[str, List[str]]:
+    """
+    Loads one document and splits it into chunks. Runs in a worker process when several documents are indexed.
+
+    Args:
+        path (str): Path of the document to load.
+
+    Returns:
+        Tuple[str, List[str]]: The document's source name (its basename) and its text chunks.
+    """
+
+    return os.path.basename(path), preprocess_text(load_sds(path))
+
+def _chunk_cache_key(path: str, embedder: str) -> str:
+    """
+    Builds the on-disk cache key for a document's chunks and embeddings.
+
+    The key covers the file contents, the embedder that actually loaded and the splitter settings, so editing the
+    document, switching embedding model, falling back from ONNX to PyTorch, or retuning the splitter all miss the cache.
+
+    Args:
+        path (str): Path of the document.
+        embedder (str): The loaded embedder, as described by `describe_embedding_model`.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    splitter_config = CONFIG["text_splitter"]
+    digest.update(f"\0{embedder}\0{splitter_config['chunk_size']}\0{splitter_config['chunk_overlap']}".encode("utf-8"))
+    return digest.hexdigest()
+
+def _read_chunk_cache(cache_dir: str, key: str):
+    """
+    Reads a document's cached chunks and embeddings.
+
+    Args:
+        cache_dir (str): Directory holding the cache files.
+        key (str): The document's cache key from `_chunk_cache_key`.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: The chunks and their embeddings, or None if the entry is missing or unreadable.
+    """
+
+    chunks_path = os.path.join(cache_dir, f"{key}.json")
+    embeddings_path = os.path.join(cache_dir, f"{key}.npy")
+    if not (os.path.exists(chunks_path) and os.path.exists(embeddings_path)):
+        return None
+    try:
+        with open(chunks_path, "rb") as f:
+            chunks = orjson.loads(f.read())
+        embeddings = np.load(embeddings_path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable chunk cache entry {key}: {str(e)}")
+        return None
+    if len(chunks) != len(embeddings):
+        logger.warning(f"Ignoring inconsistent chunk cache entry {key}")
+        return None
+    return chunks, embeddings
+
+def _write_chunk_cache(cache_dir: str, key: str, chunks: List[str], embeddings: np.ndarray):
+    """
+    Stores a document's chunks and embeddings, writing each file atomically so readers never see a partial entry.
+
+    Args:
+        cache_dir (str): Directory holding the cache files.
+        key (str): The document's cache key from `_chunk_cache_key`.
+        chunks (List[str]): The document's text chunks.
+        embeddings (np.ndarray): Their embeddings, shaped (len(chunks), dim).
+    """
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        embeddings_path = os.path.join(cache_dir, f"{key}.npy")
+        with open(f"{embeddings_path}.tmp", "wb") as f:
+            np.save(f, embeddings)
+        os.replace(f"{embeddings_path}.tmp", embeddings_path)
+        chunks_path = os.path.join(cache_dir, f"{key}.json")
+        with open(f"{chunks_path}.tmp", "wb") as f:
+            f.write(orjson.dumps(chunks))
+        os.replace(f"{chunks_path}.tmp", chunks_path)
+    except Exception as e:
+        logger.warning(f"Could not write chunk cache entry {key}: {str(e)}")
+
 class RAGSystem:
     def __init__(self, sds_paths: List[str]):
         self.sds_paths = sds_paths
+        self.expected_sources = frozenset(os.path.basename(path) for path in sds_paths)
         self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        self.embedding_model = HuggingFaceEmbeddings(model_name=CONFIG["embedding"]["model_name"])
+        self.embedding_model = get_embedding_model()
         self.vectorstore = self._load_and_index_sds()
+        self.semantic_cache = None
+        self._semantic_answers: "OrderedDict[int, Tuple[str, float, float]]" = OrderedDict()
+        self._semantic_next_id = 0
+        self._semantic_lock = threading.Lock()
         logger.info(f"Initialized RAGSystem with {len(self.sds_paths)} paths: {self.sds_paths}")
 
     def _load_and_index_sds(self):
         """
         Loads and indexes source data structures (SDS) by processing text from the given paths and creating a FAISS vector store.
         The function processes the files at the paths specified in `self.sds_paths`, extracting chunks of text from each file and generating a FAISS index. 
+        Each file's chunks and embeddings are cached under `app.faiss_index_path`, keyed by its contents and the chunking and embedding settings,
+        so unchanged files are neither re-parsed nor re-embedded; only the index itself is rebuilt.
+        Files missing from the cache are loaded and chunked in parallel across up to `indexing.max_workers` processes.
         If no chunks are successfully loaded, an empty FAISS index is created.
         It also logs the number of chunks loaded and any errors encountered during the process.
 
@@ -45,30 +153,110 @@ class RAGSystem:
             Exception: If there are issues loading or processing any SDS paths, they are logged and skipped.
         """
 
-        all_chunks = []
+        cache_dir = CONFIG["app"].get("faiss_index_path")
+        embedder = describe_embedding_model(self.embedding_model) if cache_dir else None
+        loaded, uncached = [], []
         for path in self.sds_paths:
             try:
-                text = load_sds(path)
-                chunks = preprocess_text(text)
-                source = os.path.basename(path)
-                chunks_with_meta = [{"text": chunk, "source": source} for chunk in chunks]
-                all_chunks.extend(chunks_with_meta)
-                logger.info(f"Loaded {len(chunks)} chunks from {path}")
-            except Exception as e:
+                key = _chunk_cache_key(path, embedder) if cache_dir else None
+            except OSError as e:
                 logger.warning(f"Skipped {path} due to error: {str(e)}")
                 continue
-
-        if not all_chunks:
+            cached = _read_chunk_cache(cache_dir, key) if key else None
+            if cached is not None:
+                logger.info(f"Loaded {len(cached[0])} cached chunks for {path}")
+                loaded.append([os.path.basename(path), cached[0], cached[1]])
+            else:
+                uncached.append((path, key))
+
+        max_workers = min(len(uncached), CONFIG["indexing"].get("max_workers") or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_process_context()) if max_workers > 1 else nullcontext() as executor:
+            pending = [(path, key, executor.submit(_load_chunks, path) if executor else None) for path, key in uncached]
+            fresh = []
+            for path, key, future in pending:
+                try:
+                    source, chunks = future.result() if future else _load_chunks(path)
+                    fresh.append((key, [source, chunks, None]))
+                    logger.info(f"Loaded {len(chunks)} chunks from {path}")
+                except Exception as e:
+                    logger.warning(f"Skipped {path} due to error: {str(e)}")
+                    continue
+
+        fresh_texts = [chunk for _, (_, chunks, _) in fresh for chunk in chunks]
+        if fresh_texts:
+            fresh_embeddings = np.asarray(self.embedding_model.embed_documents(fresh_texts), dtype=np.float32)
+            offset = 0
+            for key, entry in fresh:
+                entry[2] = fresh_embeddings[offset:offset + len(entry[1])]
+                offset += len(entry[1])
+                if key and entry[1]:
+                    _write_chunk_cache(cache_dir, key, entry[1], entry[2])
+        loaded.extend(entry for _, entry in fresh)
+
+        texts, metadatas = [], []
+        for source, chunks, _ in loaded:
+            texts.extend(chunks)
+            metadatas.extend([{"source": source}] * len(chunks))
+
+        if not texts:
             logger.warning("No chunks loaded, creating empty index")
             return FAISS.from_texts([""], self.embedding_model)
 
-        texts = [chunk["text"] for chunk in all_chunks]
-        metadatas = [{"source": chunk["source"]} for chunk in all_chunks]
-
-        vectorstore = FAISS.from_texts(texts, self.embedding_model, metadatas=metadatas)
+        embeddings = np.concatenate([entry_embeddings for _, chunks, entry_embeddings in loaded if chunks]).astype(np.float32, copy=False)
+        vectorstore = FAISS.from_embeddings(list(zip(texts, embeddings.tolist())), self.embedding_model, metadatas=metadatas)
+        if len(texts) >= CONFIG["retriever"].get("ivfpq_min_chunks", 100000):
+            vectorstore.index = self._build_ivfpq_index(embeddings)
+        elif len(texts) >= CONFIG["retriever"].get("hnsw_min_chunks", 5000):
+            vectorstore.index = self._build_hnsw_index(embeddings)
         logger.info(f"Created FAISS index with {len(texts)} chunks")
         return vectorstore
 
+    def _build_hnsw_index(self, embeddings: np.ndarray):
+        """
+        Builds an HNSW graph index over the chunk embeddings to replace FAISS's default flat L2 scan.
+
+        Search cost grows roughly logarithmically with the number of chunks instead of linearly, at the price of
+        approximate results, so it is only used once the corpus reaches `retriever.hnsw_min_chunks`.
+
+        Args:
+            embeddings (np.ndarray): The chunk embeddings, in docstore order, shaped (n, dim).
+
+        Returns:
+            faiss.IndexHNSWFlat: The populated index, using the same L2 metric as the flat index it replaces.
+        """
+
+        retriever_config = CONFIG["retriever"]
+        index = faiss.IndexHNSWFlat(embeddings.shape[1], retriever_config.get("hnsw_m", 32))
+        index.hnsw.efConstruction = retriever_config.get("hnsw_ef_construction", 200)
+        index.hnsw.efSearch = retriever_config.get("hnsw_ef_search", 64)
+        index.add(embeddings)
+        logger.info(f"Built HNSW index over {index.ntotal} chunks")
+        return index
+
+    def _build_ivfpq_index(self, embeddings: np.ndarray):
+        """
+        Builds an inverted-file index with 4-bit FastScan product quantization for very large document sets.
+
+        Vectors are compressed to a few bytes each and scanned with SIMD lookup-table kernels, so memory and
+        search time stay low once the corpus reaches `retriever.ivfpq_min_chunks`, at some cost in recall.
+
+        Args:
+            embeddings (np.ndarray): The chunk embeddings, in docstore order, shaped (n, dim).
+
+        Returns:
+            faiss.Index: The trained and populated index, searched with `retriever.ivfpq_nprobe` lists.
+        """
+
+        retriever_config = CONFIG["retriever"]
+        index = faiss.index_factory(embeddings.shape[1], retriever_config.get("ivfpq_factory", "IVF256,PQ32x4fs"))
+        train_size = min(len(embeddings), retriever_config.get("ivfpq_train_size", 65536))
+        sample = np.random.default_rng(0).choice(len(embeddings), train_size, replace=False)
+        index.train(embeddings[sample])
+        index.add(embeddings)
+        faiss.extract_index_ivf(index).nprobe = retriever_config.get("ivfpq_nprobe", 16)
+        logger.info(f"Built IVF-PQ FastScan index over {index.ntotal} chunks")
+        return index
+
     def query(self, question: str) -> Tuple[str, float]:
         """
         Handles the process of querying the document retrieval system, retrieving relevant documents, reranking them, and generating a response.
@@ -87,73 +275,293 @@ class RAGSystem:
         """
 
         start_time = time.time()
+        early_answer, prepared = self._prepare_query(question)
+        if early_answer is not None:
+            return early_answer
+
+        formatted_prompt = prepared["prompt"]
+        logger.info(f"Sending prompt to Groq API, length: {len(formatted_prompt)}")
+        response = self.client.chat.completions.create(
+            model=CONFIG["groq"]["model"],
+            messages=[
+                {"role": "system", "content": DOC_SYSTEM_PROMPT},
+                {"role": "user", "content": formatted_prompt}
+            ],
+            temperature=CONFIG["groq"]["temperature"],
+            max_tokens=CONFIG["groq"]["max_tokens"]
+        )
+        end_time = time.time()
+        logger.info(f"Total Query Time: {end_time - start_time:.2f} sec")
+
+        answer = response.choices[0].message.content
+        return self._finish_query(question, answer, prepared), prepared["confidence"]
+
+    def stream_query(self, question: str) -> Iterator[str]:
+        """
+        Streaming variant of `query` that yields the formatted answer while Groq is still generating it.
+
+        Retrieval, reranking and caching behave exactly as in `query`; the pieces yielded concatenate to the
+        same formatted answer, with the citations arriving once the LLM has finished.
+
+        Parameters:
+            question (str): The query string that the user wants to ask.
+
+        Yields:
+            str: Successive pieces of the formatted answer.
+        """
+
+        start_time = time.time()
+        early_answer, prepared = self._prepare_query(question)
+        if early_answer is not None:
+            yield early_answer[0]
+            return
+
+        formatted_prompt = prepared["prompt"]
+        logger.info(f"Streaming prompt to Groq API, length: {len(formatted_prompt)}")
+        stream = self.client.chat.completions.create(
+            model=CONFIG["groq"]["model"],
+            messages=[
+                {"role": "system", "content": DOC_SYSTEM_PROMPT},
+                {"role": "user", "content": formatted_prompt}
+            ],
+            temperature=CONFIG["groq"]["temperature"],
+            max_tokens=CONFIG["groq"]["max_tokens"],
+            stream=True
+        )
+
+        yield ANSWER_PREFIX
+        pieces = []
+        for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                pieces.append(token)
+                yield token
+        end_time = time.time()
+        logger.info(f"Total Query Time (streamed): {end_time - start_time:.2f} sec")
+
+        yield format_citations(prepared["chunks"], prepared["metadatas"])
+        self._finish_query(question, "".join(pieces), prepared)
+
+    def _prepare_query(self, question: str):
+        """
+        Runs everything in `query` that comes before the LLM call: cache lookups, retrieval, reranking and confidence.
+
+        Parameters:
+            question (str): The query string that the user wants to ask.
+
+        Returns:
+            Tuple[Tuple[str, float], dict]: Either (answer, confidence) and None when the question is answered without
+                the LLM, or None and a dict holding the prompt, reranked chunks, their metadata, the question
+                embedding and the BM25 confidence.
+        """
+
         cached = get_cached_response(question, query_type="document", context={"sds_paths": self.sds_paths})
         if cached:
             logger.info(f"Cache hit for question: '{question}' with paths: {self.sds_paths}")
-            return cached, 1.0 
+            return (cached, 0.0 if cached == NOT_FOUND_ANSWER else 1.0), None
 
         logger.info(f"Cache miss for question: '{question}' with paths: {self.sds_paths}")
-        retriever = self.vectorstore.as_retriever(search_kwargs={"k": CONFIG["retriever"]["search_k"]})
-
-        docs = retriever.get_relevant_documents(question)
-        expected_sources = [os.path.basename(path) for path in self.sds_paths]
-        filtered_docs = [doc for doc in docs if doc.metadata.get("source") in expected_sources]
+        query_embedding = np.asarray([self.embedding_model.embed_query(question)], dtype=np.float32)
+        semantic_hit = self._semantic_lookup(query_embedding)
+        if semantic_hit is not None:
+            return semantic_hit, None
+
+        docs, distances = self._retrieve(query_embedding, CONFIG["retriever"]["search_k"])
+        filtered = [(doc, distance) for doc, distance in zip(docs, distances) if doc.metadata.get("source") in self.expected_sources]
+        filtered_docs = [doc for doc, _ in filtered]
+        filtered_distances = [distance for _, distance in filtered]
         
         chunk_texts = [doc.page_content for doc in filtered_docs]
         chunk_metadatas = [doc.metadata for doc in filtered_docs]
         
-        logger.info(f"Retrieved {len(docs)} documents, filtered to {len(filtered_docs)} from sources: {expected_sources}")
+        logger.info(f"Retrieved {len(docs)} documents, filtered to {len(filtered_docs)} from sources: {sorted(self.expected_sources)}")
         
-        for i, doc in enumerate(filtered_docs[:3]):
-            logger.info(f"Filtered Document {i+1} (source: {doc.metadata.get('source')}): {doc.page_content[:100]}...")
+        if logger.isEnabledFor(logging.INFO):
+            for i, doc in enumerate(filtered_docs[:3]):
+                logger.info("Filtered Document %d (source: %s): %.100s...", i + 1, doc.metadata.get("source"), doc.page_content)
 
         if not filtered_docs:
             logger.warning("No relevant documents found for the query in the specified sources")
-            answer = "The answer is not present in the given documents."
+            answer = NOT_FOUND_ANSWER
             set_cached_response(question, answer, query_type="document", context={"sds_paths": self.sds_paths})
-            return answer, 0.0
-
-        reranked_chunks = rerank_chunks(chunk_texts, question)
+            return (answer, 0.0), None
+
+        dominance_ratio = CONFIG["retriever"].get("dominance_ratio", 0.0)
+        if len(filtered_distances) > 1 and filtered_distances[0] <= dominance_ratio * filtered_distances[1]:
+            logger.info(f"Top hit is dominant (distance {filtered_distances[0]:.4f} vs {filtered_distances[1]:.4f}), skipping rerank")
+            reranked_chunks, top_rerank_score, max_bm25_score = chunk_texts[:CONFIG["reranker"]["top_k"]], None, None
+        else:
+            reranked_chunks, top_rerank_score, max_bm25_score = self._rerank(question, chunk_texts)
         if not reranked_chunks:
             logger.warning("No relevant chunks found after reranking")
-            answer = "The answer is not present in the given documents."
+            answer = NOT_FOUND_ANSWER
             set_cached_response(question, answer, query_type="document", context={"sds_paths": self.sds_paths})
-            return answer, 0.0
+            return (answer, 0.0), None
 
         context = "\n".join(reranked_chunks)
 
-        tokenized_chunks = [chunk.split() for chunk in chunk_texts]
-        bm25 = BM25Okapi(tokenized_chunks)
-        tokenized_query = question.split()
-        scores = bm25.get_scores(tokenized_query)
-        confidence = max(scores) / (max(scores) + 1) if max(scores) > 0 else 0.0  
+        if max_bm25_score is None:
+            max_bm25_score = float(bm25_scores([tokenize(chunk) for chunk in chunk_texts], tokenize(question)).max())
+        confidence = max_bm25_score / (max_bm25_score + 1) if max_bm25_score > 0 else 0.0
+
+        min_rerank_score = CONFIG["reranker"].get("cross_encoder_min_score")
+        if confidence < CONFIG["retriever"].get("min_confidence", 0.0) or (
+            top_rerank_score is not None and min_rerank_score is not None and top_rerank_score < min_rerank_score
+        ):
+            logger.info(f"Retrieval confidence {confidence:.3f} is below the threshold, answering without the LLM")
+            answer = NOT_FOUND_ANSWER
+            set_cached_response(question, answer, query_type="document", context={"sds_paths": self.sds_paths})
+            return (answer, confidence), None
 
-        formatted_prompt = doc_prompt_template.format(
+        formatted_prompt = format_doc_prompt(
             retrieved_documents=context, query=question
         )
 
-        logger.info(f"Sending prompt to Groq API, length: {len(formatted_prompt)}")
-        response = self.client.chat.completions.create(
-            model=CONFIG["groq"]["model"], 
-            messages=[{"role": "user", "content": formatted_prompt}],
-            temperature=CONFIG["groq"]["temperature"],
-            max_tokens=CONFIG["groq"]["max_tokens"]
-        )
-        end_time = time.time()
-        logger.info(f"Total Query Time: {end_time - start_time:.2f} sec")
+        return None, {
+            "prompt": formatted_prompt,
+            "chunks": reranked_chunks,
+            "metadatas": chunk_metadatas,
+            "embedding": query_embedding,
+            "confidence": confidence
+        }
 
-        answer = response.choices[0].message.content
-        formatted_answer = format_response(answer, reranked_chunks, chunk_metadatas)
+    def _finish_query(self, question: str, answer: str, prepared: dict) -> str:
+        """
+        Formats the LLM's answer with citations and stores it in the exact-match and semantic caches.
+
+        Parameters:
+            question (str): The query string that the user asked.
+            answer (str): The raw answer generated by the LLM.
+            prepared (dict): The retrieval state returned by `_prepare_query`.
 
+        Returns:
+            str: The formatted answer.
+        """
+
+        formatted_answer = format_response(answer, prepared["chunks"], prepared["metadatas"])
         set_cached_response(question, formatted_answer, query_type="document", context={"sds_paths": self.sds_paths})
+        self._semantic_store(prepared["embedding"], formatted_answer, prepared["confidence"])
+        return formatted_answer
+
+    def _retrieve(self, query_embedding: np.ndarray, k: int):
+        """
+        Searches the FAISS index directly with an already computed question embedding.
+
+        Args:
+            query_embedding (np.ndarray): The L2-normalized question embedding, shaped (1, dim).
+            k (int): The number of nearest chunks to return.
+
+        Returns:
+            Tuple[List[Document], List[float]]: The nearest chunks and their distances, closest first.
+        """
+
+        distances, indices = self.vectorstore.index.search(query_embedding, k)
+        docs, doc_distances = [], []
+        for distance, index in zip(distances[0], indices[0]):
+            if index < 0:
+                continue
+            doc = self.vectorstore.docstore.search(self.vectorstore.index_to_docstore_id[index])
+            if isinstance(doc, str):
+                logger.warning(f"FAISS index points at a missing docstore entry: {doc}")
+                continue
+            docs.append(doc)
+            doc_distances.append(float(distance))
+        return docs, doc_distances
+
+    def _rerank(self, question: str, chunk_texts: List[str]) -> Tuple[List[str], float, float]:
+        """
+        Orders the retrieved chunks by relevance, using the cross-encoder when `reranker.cross_encoder` is enabled
+        and BM25 otherwise (or if the cross-encoder fails).
 
-        return formatted_answer, confidence
+        Args:
+            question (str): The user's question.
+            chunk_texts (List[str]): The retrieved chunk texts.
+
+        Returns:
+            Tuple[List[str], float, float]: The top `reranker.top_k` chunks, most relevant first; the cross-encoder
+                score of the best chunk (None when BM25 was used); and the best raw BM25 score (None when the
+                cross-encoder was used), which the caller reuses for the confidence instead of scoring again.
+        """
+
+        if CONFIG["reranker"].get("cross_encoder", False):
+            try:
+                scores = rerank_chunks_batched([(question, chunk) for chunk in chunk_texts])
+                top_indices = np.argsort(scores)[::-1][:CONFIG["reranker"]["top_k"]]
+                return [chunk_texts[i] for i in top_indices], float(scores[top_indices[0]]), None
+            except Exception as e:
+                logger.error(f"Cross-encoder rerank failed, falling back to BM25: {str(e)}")
+        reranked_chunks, bm25_top_scores = rerank_chunks(chunk_texts, question, return_scores=True)
+        return reranked_chunks, None, float(bm25_top_scores[0]) if len(bm25_top_scores) else 0.0
+
+    def _semantic_lookup(self, query_embedding: np.ndarray):
+        """
+        Looks up an answer to a paraphrase of the question among previously answered questions.
+
+        The semantic cache is disabled unless `cache.semantic_threshold` is set. Entries expire after
+        `cache.ttl_seconds`, like the exact-match cache.
+
+        Args:
+            query_embedding (np.ndarray): The L2-normalized question embedding, shaped (1, dim).
+
+        Returns:
+            Tuple[str, float] or None: The stored answer with its confidence scaled by the cosine similarity,
+                or None if no unexpired cached question is at least `cache.semantic_threshold` similar.
+        """
+
+        threshold = CONFIG["cache"].get("semantic_threshold")
+        if threshold is None:
+            return None
+        with self._semantic_lock:
+            self._semantic_evict(time.monotonic() - CONFIG["cache"]["ttl_seconds"], CONFIG["cache"]["max_items"])
+            if self.semantic_cache is None or self.semantic_cache.ntotal == 0:
+                return None
+            similarities, ids = self.semantic_cache.search(query_embedding, 1)
+            similarity, entry_id = float(similarities[0][0]), int(ids[0][0])
+            if entry_id < 0 or similarity < threshold:
+                return None
+            answer, confidence, _ = self._semantic_answers[entry_id]
+        logger.info(f"Semantic cache hit with similarity {similarity:.3f}")
+        return answer, confidence * similarity
+
+    def _semantic_store(self, query_embedding: np.ndarray, answer: str, confidence: float):
+        if CONFIG["cache"].get("semantic_threshold") is None:
+            return
+        with self._semantic_lock:
+            now = time.monotonic()
+            self._semantic_evict(now - CONFIG["cache"]["ttl_seconds"], CONFIG["cache"]["max_items"] - 1)
+            if self.semantic_cache is None:
+                self.semantic_cache = faiss.IndexIDMap(faiss.IndexFlatIP(query_embedding.shape[1]))
+            entry_id = self._semantic_next_id
+            self._semantic_next_id += 1
+            self.semantic_cache.add_with_ids(query_embedding, np.asarray([entry_id], dtype=np.int64))
+            self._semantic_answers[entry_id] = (answer, confidence, now)
+
+    def _semantic_evict(self, stored_before: float, max_items: int):
+        """
+        Drops semantic cache entries stored before `stored_before`, then the oldest entries until at most
+        `max_items` remain. Entries are kept in insertion order, so both only ever trim the front. Must be
+        called with `_semantic_lock` held.
+
+        Args:
+            stored_before (float): `time.monotonic()` cutoff; older entries have expired.
+            max_items (int): The number of entries to keep at most.
+        """
+
+        expired = []
+        for entry_id, (_, _, stored_at) in self._semantic_answers.items():
+            if stored_at >= stored_before and len(self._semantic_answers) - len(expired) <= max_items:
+                break
+            expired.append(entry_id)
+        if expired:
+            for entry_id in expired:
+                del self._semantic_answers[entry_id]
+            self.semantic_cache.remove_ids(np.asarray(expired, dtype=np.int64))
 
     def add_document(self, text: str):
         """
         Processes and adds a document to the vector store by chunking the text and indexing it.
         If the input text is in JSON format with a 'content' field, it extracts and uses the content. 
-        The text is then chunked and indexed in the vector store.
+        The text is then chunked, embedded and indexed in the vector store `embedding.batch_size` chunks at a time, so only one batch of vectors is held in memory.
 
         Parameters:
             text (str): The document text to be added.
@@ -162,29 +570,26 @@ class RAGSystem:
             None
 
         Raises:
-            json.JSONDecodeError: If the text cannot be parsed as JSON.
+            orjson.JSONDecodeError: If the text looks like JSON but cannot be parsed; logged, and the raw text is indexed.
             Exception: For any other errors during processing or indexing.
         """
 
         start_time = time.time()
         logger.info(f"Adding document, text length: {len(text)}")
         
-        try:
-            if text.strip().startswith('[') and text.strip().endswith(']'):
-                json_data = json.loads(text)
-                if isinstance(json_data, list) and len(json_data) > 0 and isinstance(json_data[0], dict):
-                    if "content" in json_data[0]:
-                        text = json_data[0]["content"]
-                        logger.info(f"Extracted content from JSON array, new length: {len(text)}")
-            elif text.strip().startswith('{') and text.strip().endswith('}'):
-                json_data = json.loads(text)
-                if isinstance(json_data, dict) and "content" in json_data:
+        if _JSON_START.match(text):
+            try:
+                json_data = orjson.loads(text)
+                if isinstance(json_data, list) and len(json_data) > 0 and isinstance(json_data[0], dict) and "content" in json_data[0]:
+                    text = json_data[0]["content"]
+                    logger.info(f"Extracted content from JSON array, new length: {len(text)}")
+                elif isinstance(json_data, dict) and "content" in json_data:
                     text = json_data["content"]
                     logger.info(f"Extracted content from JSON object, new length: {len(text)}")
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse text as JSON, continuing with original text")
-        except Exception as e:
-            logger.warning(f"Error processing text: {str(e)}")
+            except orjson.JSONDecodeError:
+                logger.warning("Failed to parse text as JSON, continuing with original text")
+            except Exception as e:
+                logger.warning(f"Error processing text: {str(e)}")
         
         chunks = preprocess_text(text)
         logger.info(f"Chunks created: {len(chunks)}")
@@ -193,13 +598,38 @@ class RAGSystem:
             logger.warning("No chunks created from document")
             return
 
-        chunks_with_meta = [{"text": chunk, "source": "web_content"} for chunk in chunks]
-        texts = [chunk["text"] for chunk in chunks_with_meta]
-        metadatas = [{"source": chunk["source"]} for chunk in chunks_with_meta]
-
-        logger.info(f"Adding {len(texts)} chunks to vectorstore")
-        self.vectorstore.add_texts(texts, metadatas=metadatas)
+        logger.info(f"Adding {len(chunks)} chunks to vectorstore")
+        batch_size = CONFIG["embedding"].get("batch_size", 64)
+        metadata = {"source": "web_content"}
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            embeddings = self.embedding_model.embed_documents(batch)
+            self.vectorstore.add_embeddings(list(zip(batch, embeddings)), metadatas=[metadata] * len(batch))
+        with self._semantic_lock:
+            self.semantic_cache = None
+            self._semantic_answers.clear()
 
         logger.info(f"Added web_content with {len(chunks)} chunks to temporary index")
         end_time = time.time()
-        logger.info(f"Indexing Time: {end_time - start_time:.2f} sec")
\ No newline at end of file
+        logger.info(f"Indexing Time: {end_time - start_time:.2f} sec")
+
+@functools.lru_cache(maxsize=8)
+def _get_cached_rag_system(paths_key: tuple) -> RAGSystem:
+    return RAGSystem(sds_paths=[path for path, _ in paths_key])
+
+def get_rag_system(sds_paths: List[str]) -> RAGSystem:
+    """
+    Returns a shared RAGSystem for the given document paths, building its FAISS index only on first use.
+
+    Instances are memoized in a small LRU keyed by the sorted paths and their modification times,
+    so re-uploading a file under the same name rebuilds the index instead of serving stale chunks.
+
+    Args:
+        sds_paths (List[str]): Paths of the documents to index.
+
+    Returns:
+        RAGSystem: The cached or newly built RAG system.
+    """
+
+    paths_key = tuple((path, os.path.getmtime(path) if os.path.exists(path) else None) for path in sorted(sds_paths))
+    return _get_cached_rag_system(paths_key)
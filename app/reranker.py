@@ -1,64 +1,235 @@
-from typing import List
-from rank_bm25 import BM25Okapi
+from typing import List, Tuple
 import numpy as np
+import os
+import re
 import logging
+import functools
 from app.config import CONFIG
 
 logger = logging.getLogger(__name__)
 
-def rerank_chunks(chunks: List[str], query: str, k: int = CONFIG["reranker"]["top_k"]):
+NUMBA_MIN_CHUNKS = 1000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens for BM25, dropping punctuation so "flammable." matches "flammable".
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The word tokens, in order.
+    """
+
+    return _TOKEN_RE.findall(text.lower())
+
+@functools.lru_cache(maxsize=1)
+def _get_bm25_kernel():
+    """
+    Returns the parallel Numba BM25 kernel, compiling (or loading from numba's cache) on first use.
+
+    Returns:
+        Callable or None: `app.bm25_kernel.bm25_kernel`, or None if numba isn't installed.
+    """
+
+    try:
+        from app.bm25_kernel import bm25_kernel
+    except ImportError:
+        logger.info("numba is not installed; scoring large chunk sets with NumPy")
+        return None
+    return bm25_kernel
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of tokenized chunks, giving the same scores as `rank_bm25.BM25Okapi`.
+
+    The length-normalized, saturated term frequencies don't depend on the query, so they are computed once and
+    kept as a CSR matrix (one row per chunk, one entry per distinct term). Scoring a query is then a single sparse
+    matrix-vector product with its idf weights. Large corpora run it in a parallel Numba kernel; otherwise it is
+    done with NumPy gather and bincount.
+    """
+
+    def __init__(self, tokenized_chunks: List[List[str]], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.vocab = {}
+
+        indptr, indices, data = [0], [], []
+        for tokens in tokenized_chunks:
+            term_ids = np.asarray([self.vocab.setdefault(token, len(self.vocab)) for token in tokens], dtype=np.int64)
+            terms, counts = np.unique(term_ids, return_counts=True)
+            indices.append(terms)
+            data.append(counts)
+            indptr.append(indptr[-1] + len(terms))
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+        term_freqs = np.concatenate(data).astype(np.float64) if data else np.empty(0, dtype=np.float64)
+
+        self.num_docs = len(tokenized_chunks)
+        self.entry_docs = np.repeat(np.arange(self.num_docs), np.diff(self.indptr))
+        doc_lens = np.asarray([len(tokens) for tokens in tokenized_chunks], dtype=np.float64)
+        avgdl = doc_lens.mean() if self.num_docs and doc_lens.any() else 1.0
+        length_norm = k1 * (1 - b + b * doc_lens / avgdl)
+        self.saturated = term_freqs * (k1 + 1) / (term_freqs + length_norm[self.entry_docs])
+
+        doc_freqs = np.bincount(self.indices, minlength=len(self.vocab))
+        self.idf = np.log(len(tokenized_chunks) - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+        if len(self.idf):
+            self.idf[self.idf < 0] = epsilon * self.idf.mean()
+
+    def get_scores(self, tokenized_query: List[str]) -> np.ndarray:
+        """
+        Scores every chunk against the query.
+
+        Args:
+            tokenized_query (List[str]): The query tokens; repeated tokens count once per occurrence.
+
+        Returns:
+            np.ndarray: One BM25 score per chunk, in chunk order.
+        """
+
+        query_weights = np.zeros(len(self.vocab))
+        for token in tokenized_query:
+            term_id = self.vocab.get(token)
+            if term_id is not None:
+                query_weights[term_id] += self.idf[term_id]
+        if not query_weights.any():
+            return np.zeros(self.num_docs)
+
+        if self.num_docs >= NUMBA_MIN_CHUNKS:
+            kernel = _get_bm25_kernel()
+            if kernel is not None:
+                return kernel(self.indptr, self.indices, self.saturated, query_weights)
+
+        return np.bincount(self.entry_docs, weights=query_weights[self.indices] * self.saturated, minlength=self.num_docs)
+
+def bm25_scores(tokenized_chunks: List[List[str]], tokenized_query: List[str], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> np.ndarray:
+    """
+    Scores each chunk against the query with Okapi BM25.
+
+    Gives the same scores as `BM25Okapi(tokenized_chunks).get_scores(tokenized_query)`, including its
+    floor of `epsilon * mean idf` for terms that appear in more than half of the chunks.
+
+    Args:
+        tokenized_chunks (List[List[str]]): The tokens of each chunk.
+        tokenized_query (List[str]): The query tokens; repeated tokens count once per occurrence.
+        k1 (float): Term-frequency saturation parameter.
+        b (float): Length-normalization parameter.
+        epsilon (float): Fraction of the mean idf used for terms whose idf would be negative.
+
+    Returns:
+        np.ndarray: One BM25 score per chunk.
+    """
+
+    return BM25Index(tokenized_chunks, k1=k1, b=b, epsilon=epsilon).get_scores(tokenized_query)
+
+@functools.lru_cache(maxsize=1)
+def _get_cross_encoder(model_name: str, model_dir: str):
+    """
+    Returns the process-wide ONNX cross-encoder and its tokenizer, exporting the model to `model_dir` on first use.
+
+    Args:
+        model_name (str): Hugging Face Hub id of the cross-encoder.
+        model_dir (str): Directory holding (or receiving) the ONNX export.
+
+    Returns:
+        Tuple[ORTModelForSequenceClassification, PreTrainedTokenizer]: The model and tokenizer.
+    """
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification #type: ignore
+    from transformers import AutoTokenizer
+
+    if os.path.isdir(model_dir):
+        return ORTModelForSequenceClassification.from_pretrained(model_dir), AutoTokenizer.from_pretrained(model_dir)
+
+    logger.info(f"Exporting cross-encoder {model_name} to ONNX in {model_dir}")
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model.save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+    return model, tokenizer
+
+def rerank_chunks_batched(pairs: List[Tuple[str, str]]) -> List[float]:
+    """
+    Scores (query, chunk) pairs with the configured cross-encoder in a single batched forward pass.
+
+    Args:
+        pairs (List[Tuple[str, str]]): The (query, chunk) pairs to score.
+
+    Returns:
+        List[float]: One relevance score per pair; higher is more relevant.
+    """
+
+    if not pairs:
+        return []
+
+    reranker_config = CONFIG["reranker"]
+    model, tokenizer = _get_cross_encoder(reranker_config["cross_encoder_model"], reranker_config["cross_encoder_dir"])
+    queries, chunks = zip(*pairs)
+    encoded = tokenizer(list(queries), list(chunks), padding=True, truncation=True, max_length=512, return_tensors="np")
+    logits = np.asarray(model(**encoded).logits)
+    return logits.reshape(len(pairs), -1)[:, -1].tolist()
+
+def rerank_chunks(chunks: List[str], query: str, k: int = CONFIG["reranker"]["top_k"], return_scores: bool = False):
     """
     Reranks document chunks based on relevance to the query using BM25.
 
-    This function tokenizes the chunks and the query, calculates BM25 scores, and returns the top-k most relevant chunks.
+    This function tokenizes the chunks and the query, calculates BM25 scores with `BM25Index`, and returns the top-k most relevant chunks.
 
     Parameters:
         chunks (List[str]): The list of document chunks to be ranked.
         query (str): The query to compare against the chunks.
         k (int): The number of top chunks to return (default is CONFIG["reranker"]["top_k"]).
+        return_scores (bool): Also return the raw (unnormalized) BM25 scores of the returned chunks.
 
     Returns:
-        List[str]: The top-k most relevant chunks.
+        List[str]: The top-k most relevant chunks. With `return_scores`, a tuple of those chunks and a
+            np.ndarray of their raw BM25 scores, highest first.
 
     Logs warnings if no valid chunks or tokens are found, or if BM25 scores are low.
     """
 
     if not chunks or all(not chunk.strip() for chunk in chunks):
         logger.warning("No valid chunks retrieved for reranking.")
-        return []
+        return ([], np.zeros(0)) if return_scores else []
 
     if not query.strip():
         logger.warning("Empty query. Returning original chunks.")
-        return chunks[:k]
+        return (chunks[:k], np.zeros(len(chunks[:k]))) if return_scores else chunks[:k]
 
-    tokenized_chunks = [chunk.split() for chunk in chunks if chunk.strip()]
+    chunks = [chunk for chunk in chunks if chunk.strip()]
+    tokenized_chunks = [tokenize(chunk) for chunk in chunks]
     
     if not tokenized_chunks:
         logger.warning("No valid tokenized chunks after processing.")
-        return []
+        return ([], np.zeros(0)) if return_scores else []
 
     for i, tokens in enumerate(tokenized_chunks[:3]):
-        logger.info(f"Chunk {i} token count: {len(tokens)}")
+        logger.info("Chunk %d token count: %d", i, len(tokens))
         if len(tokens) < 5:
-            logger.warning(f"Very few tokens in chunk {i}: {tokens}")
+            logger.warning("Very few tokens in chunk %d: %s", i, tokens)
     
-    bm25 = BM25Okapi(tokenized_chunks)
-    tokenized_query = query.split()
-    logger.info(f"Query tokens: {tokenized_query}")
+    tokenized_query = tokenize(query)
+    logger.info("Query tokens: %s", tokenized_query)
     
-    scores = bm25.get_scores(tokenized_query)
+    raw_scores = BM25Index(tokenized_chunks).get_scores(tokenized_query)
 
-    if not any(scores):
+    if not raw_scores.any():
         logger.warning("BM25 scores are all zero. Query may not match chunks well.")
 
-    scores = np.array(scores)
-    if scores.max() > 0:
-        scores = scores / scores.max()
+    scores = raw_scores / raw_scores.max() if raw_scores.max() > 0 else raw_scores
 
-    top_indices = np.argsort(scores)[::-1][:k]
+    if k < len(scores):
+        top_indices = np.argpartition(-scores, k)[:k]
+        top_indices = top_indices[np.argsort(-scores[top_indices], kind="stable")]
+    else:
+        top_indices = np.argsort(-scores, kind="stable")
     top_chunks = [chunks[i] for i in top_indices]
 
-    for i, idx in enumerate(top_indices):
-        logger.info(f"Top-{i+1} Chunk (Score: {scores[idx]:.4f}): {chunks[idx][:100]}...")
+    if logger.isEnabledFor(logging.INFO):
+        for i, idx in enumerate(top_indices):
+            logger.info("Top-%d Chunk (Score: %.4f): %.100s...", i + 1, scores[idx], chunks[idx])
 
+    if return_scores:
+        return top_chunks, raw_scores[top_indices]
     return top_chunks
\ No newline at end of file
@@ -4,16 +4,64 @@ import time
 import pdfplumber
 import logging
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from app.config import CONFIG
 
 logger = logging.getLogger(__name__)
 
+PDF_PARALLEL_MIN_PAGES = 4
+
+def get_process_context():
+    """
+    Returns the multiprocessing context for worker process pools.
+
+    The server process runs many threads (batchers, thread pools, ONNX Runtime and torch intra-op threads),
+    and forking it can deadlock a child on a lock held at fork time, so workers are started from a clean
+    forkserver process where the platform supports it, and spawned otherwise.
+
+    Returns:
+        multiprocessing.context.BaseContext: The 'forkserver' context, or 'spawn' where forkserver is unavailable.
+    """
+
+    return multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> str:
+    """
+    Extracts text and tables from a contiguous range of PDF pages. Runs in a worker process for large PDFs,
+    reopening the file there since pdfplumber objects can't be pickled.
+
+    Args:
+        file_path (str): Path to the PDF file.
+        start (int): Index of the first page to extract.
+        stop (int): Index one past the last page to extract.
+
+    Returns:
+        str: The extracted text of the pages, in page order.
+    """
+
+    parts = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            page_text = page.extract_text() or ""
+            parts.append(page_text + "\n")
+            logger.info(f"Extracted {len(page_text)} characters from PDF page")
+
+            tables = page.extract_tables()
+            if tables:
+                logger.info(f"Extracted {len(tables)} tables from PDF page")
+            for table in tables:
+                for row in table:
+                    parts.append(" | ".join(str(cell).strip() if cell else "" for cell in row) + "\n")
+    return "".join(parts)
+
 def load_sds(file_path: str):
     """
     Loads and extracts text (including tables) from a PDF or DOCX file.
 
     Supports:
-    - PDFs: Extracts text and tables from all pages.
+    - PDFs: Extracts text and tables from all pages. PDFs with at least `PDF_PARALLEL_MIN_PAGES` pages are split into
+      page ranges extracted in parallel across up to `indexing.max_workers` processes, unless this is already a worker process.
     - DOCX: Extracts paragraphs and table contents.
 
     Args:
@@ -33,17 +81,17 @@ def load_sds(file_path: str):
     try:
         if file_path.lower().endswith('.pdf'):
             with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    text += page_text + "\n"
-                    logger.info(f"Extracted {len(page_text)} characters from PDF page")
-
-                    tables = page.extract_tables()
-                    if tables:
-                        logger.info(f"Extracted {len(tables)} tables from PDF page")
-                    for table in tables:
-                        for row in table:
-                            text += " | ".join(str(cell).strip() if cell else "" for cell in row) + "\n"
+                n_pages = len(pdf.pages)
+
+            max_workers = min(n_pages, CONFIG["indexing"].get("max_workers") or os.cpu_count() or 1)
+            if n_pages < PDF_PARALLEL_MIN_PAGES or max_workers < 2 or multiprocessing.parent_process() is not None:
+                text = _extract_pdf_pages(file_path, 0, n_pages)
+            else:
+                bounds = [n_pages * i // max_workers for i in range(max_workers + 1)]
+                with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_process_context()) as executor:
+                    futures = [executor.submit(_extract_pdf_pages, file_path, start, stop) for start, stop in zip(bounds, bounds[1:])]
+                    text = "".join(future.result() for future in futures)
+                logger.info(f"Extracted {n_pages} PDF pages across {max_workers} processes")
 
         elif file_path.lower().endswith('.docx'):
             doc = Document(file_path)
@@ -1,8 +1,10 @@
 import logging
 import time
+import functools
+from typing import Iterator
 from tavily import TavilyClient
 from groq import Groq
-from app.prompt_template import web_prompt_template
+from app.prompt_template import WEB_SYSTEM_PROMPT, format_web_prompt
 from app.config import CONFIG
 from dotenv import load_dotenv
 import os
@@ -11,11 +13,70 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+NO_ANSWER = "I couldn’t find a definitive answer based on available web information."
+
 class WebSearchAgent:
     def __init__(self):
         self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
+    def _gather_web_content(self, query: str):
+        """
+        Searches the web with Tavily and extracts the usable content of each result.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            Tuple[List[str], List[str]]: The extracted contents (each truncated to 2000 characters) and the URLs they came from.
+        """
+
+        response = self.tavily.search(query=query, max_results=CONFIG["web_search"]["max_results"])
+        results = response.get("results", [])
+        logger.info(f"Retrieved {len(results)} web results")
+
+        web_content = []
+        sources = []
+        for result in results:
+            content = result.get("content", "")
+            url = result.get("url", "unknown")
+            if content:
+                web_content.append(content[:2000])
+                sources.append(url)
+                logger.info(f"Extracted {len(content)} chars from {url}")
+            else:
+                logger.warning(f"No content in result: {url}")
+        return web_content, sources
+
+    def _create_completion(self, query: str, web_content: list, stream: bool = False):
+        """
+        Asks the Groq LLM to answer the query from the extracted web content.
+
+        Args:
+            query (str): The search query.
+            web_content (list): The extracted web contents.
+            stream (bool): Whether to return a stream of completion chunks instead of the full completion.
+
+        Returns:
+            The Groq chat completion, or an iterator of completion chunks when `stream` is True.
+        """
+
+        formatted_prompt = format_web_prompt(
+            web_content="\n".join(web_content), query=query
+        )
+
+        logger.info(f"Sending web prompt to Groq API, length: {len(formatted_prompt)}")
+        return self.client.chat.completions.create(
+            model=CONFIG["groq"]["model"],
+            messages=[
+                {"role": "system", "content": WEB_SYSTEM_PROMPT},
+                {"role": "user", "content": formatted_prompt}
+            ],
+            temperature=CONFIG["groq"]["temperature"],
+            max_tokens=CONFIG["groq"]["max_tokens"],
+            stream=stream
+        )
+
     def search_web(self, query: str) -> dict:
         """
         Performs a web search for the given query using the Tavily API and generates an answer using a language model.
@@ -31,51 +92,16 @@ class WebSearchAgent:
         logger.info(f"Web search for query: {query}")
 
         try:
-            response = self.tavily.search(query=query, max_results=CONFIG["web_search"]["max_results"])
-            results = response.get("results", [])
-            logger.info(f"Retrieved {len(results)} web results")
-
-            if not results:
-                logger.warning("No web results found for query.")
-                return {
-                    "answer": "I couldn’t find a definitive answer based on available web information.",
-                    "ground_truth": [],
-                    "sources": []
-                }
-
-            web_content = []
-            sources = []
-            for result in results:
-                content = result.get("content", "")
-                url = result.get("url", "unknown")
-                if content:
-                    web_content.append(content[:2000])
-                    sources.append(url)
-                    logger.info(f"Extracted {len(content)} chars from {url}")
-                else:
-                    logger.warning(f"No content in result: {url}")
-
+            web_content, sources = self._gather_web_content(query)
             if not web_content:
                 logger.warning("No valid content extracted from web.")
                 return {
-                    "answer": "I couldn’t find a definitive answer based on available web information.",
+                    "answer": NO_ANSWER,
                     "ground_truth": [],
                     "sources": sources
                 }
 
-            combined_content = "\n".join(web_content)
-
-            formatted_prompt = web_prompt_template.format(
-                web_content=combined_content, query=query
-            )
-
-            logger.info(f"Sending web prompt to Groq API, length: {len(formatted_prompt)}")
-            response = self.client.chat.completions.create(
-                model=CONFIG["groq"]["model"],
-                messages=[{"role": "user", "content": formatted_prompt}],
-                temperature=CONFIG["groq"]["temperature"],
-                max_tokens=CONFIG["groq"]["max_tokens"]
-            )
+            response = self._create_completion(query, web_content)
 
             answer = response.choices[0].message.content
             end_time = time.time()
@@ -90,7 +116,51 @@ class WebSearchAgent:
         except Exception as e:
             logger.error(f"Web search failed: {str(e)}", exc_info=True)
             return {
-                "answer": "I couldn’t find a definitive answer based on available web information.",
+                "answer": NO_ANSWER,
                 "ground_truth": [],
                 "sources": []
-            }
\ No newline at end of file
+            }
+
+    def stream_search_web(self, query: str) -> Iterator[str]:
+        """
+        Streaming variant of `search_web` that yields the answer while the LLM is still generating it.
+
+        Args:
+            query (str): The search query.
+
+        Yields:
+            str: Successive pieces of the answer. If the search fails or finds nothing, the fallback answer is yielded once.
+        """
+
+        start_time = time.time()
+        logger.info(f"Streaming web search for query: {query}")
+
+        try:
+            web_content, _ = self._gather_web_content(query)
+            if not web_content:
+                logger.warning("No valid content extracted from web.")
+                yield NO_ANSWER
+                return
+            stream = self._create_completion(query, web_content, stream=True)
+        except Exception as e:
+            logger.error(f"Web search failed: {str(e)}", exc_info=True)
+            yield NO_ANSWER
+            return
+
+        for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                yield token
+        end_time = time.time()
+        logger.info(f"Web Search Time (streamed): {end_time - start_time:.2f} sec")
+
+@functools.lru_cache(maxsize=1)
+def get_web_agent() -> WebSearchAgent:
+    """
+    Returns the shared WebSearchAgent, creating its Groq and Tavily clients on first use only.
+
+    Returns:
+        WebSearchAgent: The process-wide web search agent.
+    """
+
+    return WebSearchAgent()
\ No newline at end of file
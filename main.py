@@ -1,4 +1,5 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pathlib import Path
 import os
@@ -12,9 +13,9 @@ from pydantic import BaseModel
 from app.config import CONFIG
 from app.graph import run_agent_workflow
 from app.excel_processor import ExcelToSQLProcessor
-from app.web_search import WebSearchAgent
+from app.web_search import get_web_agent
 from app.cache import get_cached_response, set_cached_response
-from app.evaluation import EvaluationSystem
+from app.evaluation import get_evaluation_system
 
 load_dotenv()
 
@@ -30,7 +31,7 @@ logger = logging.getLogger(__name__)
 
 excel_processor = ExcelToSQLProcessor(db_path="excel_data.sqlite")
 schema_map = {}
-evaluator = EvaluationSystem()
+evaluator = get_evaluation_system()
 
 UPLOAD_DIR = Path(CONFIG["app"]["upload_dir"])
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -193,18 +194,8 @@ async def sql_query(query: str = Query(...), schema_name: Optional[str] = Query(
         return {"query": query, "response": cached_response, "metrics": {}}
 
     try:
-        if schema_name and schema_name in schema_map:
-            original_get_table_info = excel_processor.get_table_info
-            def filtered_table_info():
-                full_tables = original_get_table_info()
-                filtered_tables = {k: v for k, v in full_tables.items() if k in schema_map[schema_name]}
-                return filtered_tables
-            excel_processor.get_table_info = filtered_table_info
-
-        response = excel_processor.process_natural_language_query(query)
-
-        if schema_name and schema_name in schema_map:
-            excel_processor.get_table_info = original_get_table_info
+        tables = schema_map.get(schema_name) if schema_name else None
+        response = await excel_processor.aprocess_natural_language_query(query, tables)
 
         metrics = {}
         if evaluate_metrics:
@@ -220,6 +211,43 @@ async def sql_query(query: str = Query(...), schema_name: Optional[str] = Query(
         logger.error(f"Error processing SQL query: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing SQL query: {str(e)}")
 
+@app.post("/sql-query/stream/")
+async def sql_query_stream(query: str = Query(...), schema_name: Optional[str] = Query(None)):
+    """
+    Streaming variant of `/sql-query/` that returns the natural language response as plain text chunks while the LLM generates it.
+
+    Parameters:
+        query (str): The natural language query to be answered from the uploaded Excel data.
+        schema_name (str, optional): The name of the schema to filter the tables for the query. If not provided, all tables are used.
+
+    Returns:
+        StreamingResponse: A `text/plain` stream of the response.
+
+    Cache Logic:
+        Cached responses are streamed back in a single chunk; otherwise the full streamed response is cached once it completes.
+    """
+
+    logger.info(f"Streaming SQL query request: {query}, schema: {schema_name}")
+    context = {"schema_name": schema_name} if schema_name else None
+    cached_response = get_cached_response(query, "sql", context)
+    if cached_response:
+        logger.info(f"Cache hit for SQL query: {query}, schema: {schema_name}")
+        return StreamingResponse(iter([cached_response]), media_type="text/plain")
+
+    tables = schema_map.get(schema_name) if schema_name else None
+
+    async def response_stream():
+        start_time = time.time()
+        pieces = []
+        async for piece in excel_processor.astream_natural_language_query(query, tables):
+            pieces.append(piece)
+            yield piece
+        set_cached_response(query, "".join(pieces).strip(), "sql", context)
+        end_time = time.time()
+        logger.info(f"SQL Query Streamed Response Time: {end_time - start_time:.2f} sec")
+
+    return StreamingResponse(response_stream(), media_type="text/plain")
+
 @app.post("/web-search/")
 async def web_search(question: str = Query(...), evaluate_metrics: bool = Query(False)):
     """
@@ -259,7 +287,7 @@ async def web_search(question: str = Query(...), evaluate_metrics: bool = Query(
         }
 
     try:
-        web_agent = WebSearchAgent()
+        web_agent = get_web_agent()
         result = web_agent.search_web(question)
         answer = result["answer"]
         ground_truth = result["ground_truth"]
@@ -284,6 +312,39 @@ async def web_search(question: str = Query(...), evaluate_metrics: bool = Query(
         logger.error(f"Error processing web search: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing web search: {str(e)}")
 
+@app.post("/web-search/stream/")
+async def web_search_stream(question: str = Query(...)):
+    """
+    Streaming variant of `/web-search/` that returns the answer as plain text chunks while the LLM generates it.
+
+    Parameters:
+        question (str): The question to be searched on the web.
+
+    Returns:
+        StreamingResponse: A `text/plain` stream of the answer.
+
+    Cache Logic:
+        Cached answers are streamed back in a single chunk; otherwise the full streamed answer is cached once it completes.
+    """
+
+    logger.info(f"Streaming web search request: {question}")
+    cached_response = get_cached_response(question, "web")
+    if cached_response:
+        logger.info(f"Cache hit for web search: {question}")
+        return StreamingResponse(iter([cached_response]), media_type="text/plain")
+
+    def answer_stream():
+        start_time = time.time()
+        pieces = []
+        for piece in get_web_agent().stream_search_web(question):
+            pieces.append(piece)
+            yield piece
+        set_cached_response(question, "".join(pieces), "web")
+        end_time = time.time()
+        logger.info(f"Web Search Streamed Response Time: {end_time - start_time:.2f} sec")
+
+    return StreamingResponse(answer_stream(), media_type="text/plain")
+
 @app.post("/query/")
 async def query_rag(question: str = Query(...), sds_paths: Optional[str] = Query(None), evaluate_metrics: bool = Query(False)):
     """
@@ -311,23 +372,10 @@ async def query_rag(question: str = Query(...), sds_paths: Optional[str] = Query
     paths = [sds_paths] if sds_paths else [str(f) for f in UPLOAD_DIR.glob("*.pdf")] + [str(f) for f in UPLOAD_DIR.glob("*.docx")]
     logger.info(f"Querying with {len(paths)} documents: {paths}")
 
-    context = {"sds_paths": paths} if paths else None
-    cached_response = get_cached_response(question, "document", context)
-    if cached_response:
-        logger.info(f"Cache hit for document query: {question}, paths: {paths}")
-        end_time = time.time()
-        logger.info(f"API Response Time (cached): {end_time - start_time:.2f} sec")
-        return {
-            "question": question,
-            "answer": cached_response,
-            "metrics": {},
-            "sources": []
-        }
-
     if not paths:
         try:
-            from app.rag import RAGSystem
-            rag_system = RAGSystem([])
+            from app.rag import get_rag_system
+            rag_system = get_rag_system([])
             if not rag_system.vectorstore or len(rag_system.vectorstore.docstore._dict) == 0:
                 logger.warning("No data available for querying")
                 raise HTTPException(status_code=400, detail="No data available. Upload files first.")
@@ -338,8 +386,6 @@ async def query_rag(question: str = Query(...), sds_paths: Optional[str] = Query
     result = run_agent_workflow(question, paths, evaluate_metrics=evaluate_metrics)
     
     logger.info(f"Document query evaluation metrics: {result['metrics']}")
-    
-    set_cached_response(question, result["answer"], "document", context)
 
     end_time = time.time()
     logger.info(f"API Response Time: {end_time - start_time:.2f} sec")
@@ -351,6 +397,40 @@ async def query_rag(question: str = Query(...), sds_paths: Optional[str] = Query
         "sources": result.get("sources", [])
     }
 
+@app.post("/query/stream/")
+async def query_rag_stream(question: str = Query(...), sds_paths: Optional[str] = Query(None)):
+    """
+    Streaming variant of `/query/` that returns the document answer, followed by its citations, as plain text chunks while the LLM generates it.
+
+    Unlike `/query/`, the answer always comes from the documents: there is no fallback to web search for
+    low-confidence answers and no evaluation metrics. Use `/web-search/stream/` for a streamed web answer.
+
+    Parameters:
+        question (str): The question to be asked in the query.
+        sds_paths (Optional[str]): The path of the document (PDF, DOCX) to query. If not provided, all documents in the UPLOAD_DIR are used.
+
+    Returns:
+        StreamingResponse: A `text/plain` stream of the formatted answer.
+
+    Raises:
+        HTTPException: If no files have been uploaded, a 400 status code is returned.
+    """
+
+    logger.info(f"Streaming query request: {question}, sds_paths: {sds_paths}")
+    paths = [sds_paths] if sds_paths else [str(f) for f in UPLOAD_DIR.glob("*.pdf")] + [str(f) for f in UPLOAD_DIR.glob("*.docx")]
+    if not paths:
+        logger.warning("No data available for querying")
+        raise HTTPException(status_code=400, detail="No data available. Upload files first.")
+
+    def answer_stream():
+        from app.rag import get_rag_system
+        start_time = time.time()
+        yield from get_rag_system(paths).stream_query(question)
+        end_time = time.time()
+        logger.info(f"API Streamed Response Time: {end_time - start_time:.2f} sec")
+
+    return StreamingResponse(answer_stream(), media_type="text/plain")
+
 if __name__ == "__main__":
     logger.info(f"Starting {CONFIG['app']['name']} server")
     uvicorn.run(app, host=CONFIG["api"]["host"], port=CONFIG["api"]["port"])
\ No newline at end of file